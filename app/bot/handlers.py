@@ -3,11 +3,13 @@ from telegram.ext import Application, CommandHandler, ContextTypes
 from telegram import Update
 from telegram.constants import ParseMode
 from telegram.helpers import escape_markdown
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, tuple_
 from app.config import settings
-from app.db import SessionLocal
+from app.db import SessionLocal, ReadSessionLocal
 from app.models import User, Watch, Listing
-from datetime import datetime, timedelta, timezone
+from app.services.delivery import Card, send_cards, PRIORITY_INTERACTIVE
+from app.services.leaderboard import leaderboard
+from app.services.search import search_listings
 from .troost import register_troost_handlers  # add this import
 from .vavato import register_vavato_handlers
 
@@ -16,7 +18,8 @@ HELP = (
     "/watch <keywords> - Add a watch (e.g., /watch nike adidas 42)\n"
     "/unwatch - List & delete a watch by id\n"
     "/near <km> - Set search radius (e.g., /near 300)\n"
-    "/top - Top lots last 24h\n"
+    f"/top [category] - Top lots last {settings.LEADERBOARD_WINDOW_H}h (e.g., /top clothing-shoes-accessories)\n"
+    "/search <query> - Search lots (words, \"phrases\", prefix*)\n"
     "/troost - Browse Troostwijk categories\n"  # <--- new
 )
 
@@ -44,7 +47,9 @@ async def start(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     )
 
 async def help_cmd(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
-    await update.message.reply_text(HELP)
+    tops = [c for c in leaderboard.categories() if "/" not in c]
+    known = f"\n/top categories right now: {', '.join(tops[:20])}" if tops else ""
+    await update.message.reply_text(HELP + known)
 
 async def watch(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     if not ctx.args:
@@ -107,45 +112,64 @@ async def near_cmd(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(f"Radius set to {km} km.")
 
 async def top(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
-    since = datetime.now(timezone.utc) - timedelta(hours=24)
-    async with SessionLocal() as s:
-        rows = (
-            await s.execute(
-                select(Listing)
-                .where(Listing.created_at >= since)
-                .order_by(Listing.flip_score.desc())
-                .limit(10)
-            )
-        ).scalars().all()
+    category = " ".join(ctx.args).strip() if ctx.args else None
+    ranked = [key for key, _ in leaderboard.top(10, category)]
+    rows = []
+    if ranked:
+        async with ReadSessionLocal() as s:
+            by_key = {
+                (l.source, l.external_id): l
+                for l in (
+                    await s.execute(select(Listing).where(tuple_(Listing.source, Listing.external_id).in_(ranked)))
+                ).scalars()
+            }
+        rows = [by_key[k] for k in ranked if k in by_key]
     if not rows:
-        await update.message.reply_text("No fresh lots in the last 24h.")
-        return
-    for l in rows:
-        text = (
-            f"*{l.title[:100]}*\n"
-            f"[Open listing]({l.url}) • _{l.source}_\n"
-            f"Ask: *€{l.price_eur:,.0f}*  Est.margin: *€{(l.margin_estimate_eur or 0):,.0f}*\n"
-            f"{'€/unit: ' + format(l.price_per_unit, '.2f') if l.price_per_unit else ''} "
-            f"{'€/kg: ' + format(l.price_per_kg, '.2f') if l.price_per_kg else ''}\n"
-            f"{'Distance: ~' + str(int(l.distance_km)) + ' km' if l.distance_km else ''}"
-        ).replace(",", " ")
-        if l.photo_url:
-            await update.message.reply_photo(
-                photo=l.photo_url, caption=text, parse_mode=ParseMode.MARKDOWN
-            )
+        if category:
+            known = ", ".join(leaderboard.categories()[:20]) or "none yet"
+            await update.message.reply_text(f"No fresh lots in '{category}' in the last {settings.LEADERBOARD_WINDOW_H}h. Categories: {known}")
         else:
-            await update.message.reply_text(
-                text, parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=False
-            )
+            await update.message.reply_text(f"No fresh lots in the last {settings.LEADERBOARD_WINDOW_H}h.")
+        return
+    await _reply_listings(update, rows)
+
+def _listing_card(l: Listing) -> Card:
+    text = (
+        f"*{l.title[:100]}*\n"
+        f"[Open listing]({l.url}) • _{l.source}_\n"
+        f"Ask: *€{l.price_eur:,.0f}*  Est.margin: *€{(l.margin_estimate_eur or 0):,.0f}*\n"
+        f"{'€/unit: ' + format(l.price_per_unit, '.2f') if l.price_per_unit else ''} "
+        f"{'€/kg: ' + format(l.price_per_kg, '.2f') if l.price_per_kg else ''}\n"
+        f"{'Distance: ~' + str(int(l.distance_km)) + ' km' if l.distance_km else ''}"
+    ).replace(",", " ")
+    return Card(text, l.photo_url)
+
+async def _reply_listings(update: Update, rows: list[Listing]):
+    # one album instead of one paced send per lot
+    cards = [_listing_card(l) for l in rows]
+    await send_cards(update.get_bot(), update.effective_chat.id, cards, PRIORITY_INTERACTIVE)
+
+async def search_cmd(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
+    q = " ".join(ctx.args or []).strip()
+    if not q:
+        await update.message.reply_text('Usage: /search nike "air max" adi*')
+        return
+    rows = await search_listings(q, limit=10)
+    if not rows:
+        await update.message.reply_text("No lots match.")
+        return
+    await _reply_listings(update, rows)
 
 async def build_app() -> Application:
-    app = Application.builder().token(settings.TELEGRAM_BOT_TOKEN).build()
+    # replies wait on the paced delivery queue: one slow chat must not hold up everyone else's updates
+    app = Application.builder().token(settings.TELEGRAM_BOT_TOKEN).concurrent_updates(True).build()
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("help", help_cmd))
     app.add_handler(CommandHandler("watch", watch))
     app.add_handler(CommandHandler("unwatch", unwatch))
     app.add_handler(CommandHandler("near", near_cmd))
     app.add_handler(CommandHandler("top", top))
+    app.add_handler(CommandHandler("search", search_cmd))
     register_troost_handlers(app)  # <-- register /troost and callbacks
     register_vavato_handlers(app)      # <-- add this
     return app
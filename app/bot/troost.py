@@ -1,13 +1,16 @@
 # app/bot/troost.py
 from __future__ import annotations
+from functools import partial
 from typing import Any
-from telegram import Update, InputMediaPhoto
+from telegram import Update
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes, CallbackQueryHandler, CommandHandler
 
-from app.scrapers.troostwijk import TroostwijkScraper
+from app.scrapers.troostwijk import TroostwijkScraper, TrooTopCategory, TrooSubCategory
+from app.services.catalog import load_tops, load_subs
 from app.bot.keyboards import grid_keyboard
 from app.config import settings
+from app.services.delivery import Card, delivery, send_cards, PRIORITY_INTERACTIVE
 from app.services.ingest import upsert_listings
 from app.normalizer import normalize_and_snapshot
 
@@ -30,9 +33,15 @@ def _stash(ctx: ContextTypes.DEFAULT_TYPE, obj: dict[str, Any]) -> str:
 def _fetch(ctx: ContextTypes.DEFAULT_TYPE, key: str) -> dict | None:
     return ctx.user_data.get("troo_payloads", {}).get(key)
 
+def _label(name: str, lot_count: int | None, width: int = 35) -> str:
+    return f"{name[:width - 8]} ({lot_count})" if lot_count else name[:width]
+
 async def troost_entry(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
-    s = TroostwijkScraper()
-    tops = await s.list_top_categories()
+    # menus render from the persisted catalog; the static list only covers an empty table
+    tops = [
+        TrooTopCategory(name=c.name, slug=c.slug, uuid=c.uuid)
+        for c in await load_tops(TroostwijkScraper.source)
+    ] or await TroostwijkScraper(interactive=True).list_top_categories() or TroostwijkScraper.TOP_CATEGORIES
 
     rows, row = [], []
     for cat in tops:
@@ -59,11 +68,16 @@ async def troost_pick_top(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         return
 
     top_slug, top_uuid = payload["top_slug"], payload["top_uuid"]
-    s = TroostwijkScraper()
-    try:
-        subs = await s.list_subcategories(top_slug, top_uuid)
-    except Exception as e:
-        subs = []
+    subs = [
+        TrooSubCategory(top_slug=c.parent_slug, sub_slug=c.slug, uuid=c.uuid, name=c.name, url=c.url, lot_count=c.lot_count)
+        for c in await load_subs(TroostwijkScraper.source, top_slug)
+    ]
+    if not subs:
+        # not in the catalog yet: scrape live
+        try:
+            subs = await TroostwijkScraper(interactive=True).list_subcategories(top_slug, top_uuid)
+        except Exception:
+            subs = []
     if not subs:
         # Fallback: show top lots directly
         t2 = _stash(ctx, {"mode_payload": {"top_slug": top_slug, "top_uuid": top_uuid}})
@@ -84,7 +98,7 @@ async def troost_pick_top(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
             "uuid": sc.uuid,
             "name": sc.name,
         })
-        labels.append((sc.name[:35], f"troo:sub:{t2}"))
+        labels.append((_label(sc.name, sc.lot_count), f"troo:sub:{t2}"))
 
     rows = [labels[i:i+2] for i in range(0, len(labels), 2)]
     await q.edit_message_text(
@@ -122,7 +136,7 @@ async def troost_show_mode(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         return
     payload = container["mode_payload"]
 
-    s = TroostwijkScraper()
+    s = TroostwijkScraper(interactive=True)
     if "sub_slug" in payload:
         raws = await s.fetch_lots_in_subcategory(payload["top_slug"], payload["sub_slug"], payload["uuid"], limit=MAX_MEDIA)
     else:
@@ -138,31 +152,19 @@ async def troost_show_mode(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     await q.edit_message_text("Here you go 👇")
 
 async def _send_cards(update: Update, snaps: list[dict]):
-    chat_id = update.effective_chat.id
-    media, texts = [], []
-    for it in snaps[:MAX_MEDIA]:
-        cap = _fmt_card(it)
-        if it.get("photo_url"):
-            media.append(InputMediaPhoto(media=it["photo_url"], caption=cap, parse_mode=ParseMode.MARKDOWN))
-        else:
-            texts.append(cap)
-
-    if media:
-        try:
-            await update.get_bot().send_media_group(chat_id=chat_id, media=media)
-        except Exception:
-            for m in media:
-                await update.get_bot().send_photo(chat_id=chat_id, photo=m.media, caption=m.caption, parse_mode=ParseMode.MARKDOWN)
-
-    for t in texts:
-        await update.get_bot().send_message(chat_id=chat_id, text=t, parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=False)
+    chat_id, bot = update.effective_chat.id, update.get_bot()
+    cards = [Card(_fmt_card(it), it.get("photo_url")) for it in snaps[:MAX_MEDIA]]
+    await send_cards(bot, chat_id, cards, PRIORITY_INTERACTIVE)
 
     lines = []
     for i, it in enumerate(snaps[:MAX_MEDIA], start=1):
         price = f"€{it.get('price_eur', 0):,.0f}".replace(",", " ")
         lines.append(f"{i}. [{it['title'][:70]}]({it['url']}) — *{price}*")
     if lines:
-        await update.get_bot().send_message(chat_id=chat_id, text="**Summary**\n" + "\n".join(lines), parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True)
+        await delivery.send(chat_id, partial(
+            bot.send_message, chat_id=chat_id, text="**Summary**\n" + "\n".join(lines),
+            parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True,
+        ), PRIORITY_INTERACTIVE)
 
 def _fmt_card(it: dict) -> str:
     parts = [f"*{it['title'][:100]}*", f"[Open listing]({it['url']}) • _{it['source']}_"]
@@ -1,13 +1,16 @@
 # app/bot/vavato.py
 from __future__ import annotations
+from functools import partial
 from typing import Any
-from telegram import Update, InputMediaPhoto
+from telegram import Update
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes, CallbackQueryHandler, CommandHandler
 
-from app.scrapers.vavato import VavatoScraper
+from app.scrapers.vavato import VavatoScraper, VTopCategory, VSubCategory
+from app.services.catalog import load_tops, load_subs
 from app.bot.keyboards import grid_keyboard
 from app.config import settings
+from app.services.delivery import Card, delivery, send_cards, PRIORITY_INTERACTIVE
 from app.services.ingest import upsert_listings
 from app.normalizer import normalize_and_snapshot
 
@@ -33,17 +36,23 @@ def _fetch(ctx: ContextTypes.DEFAULT_TYPE, key: str) -> dict | None:
 
 # ----------------------------- flows -----------------------------
 
+def _label(name: str, lot_count: int | None, width: int = 35) -> str:
+    return f"{name[:width - 8]} ({lot_count})" if lot_count else name[:width]
+
 async def vavato_entry(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
-    s = VavatoScraper()
-    tops = await s.list_top_categories()
+    # menus render from the persisted catalog; scrape live only while it is still empty
+    tops = [
+        VTopCategory(name=c.name, slug=c.slug, uuid=c.uuid, lot_count=c.lot_count)
+        for c in await load_tops(VavatoScraper.source)
+    ] or await VavatoScraper(interactive=True).list_top_categories()
     if not tops:
         await update.effective_message.reply_text("Could not discover categories right now. Try again shortly.")
         return
 
     rows, row = [], []
     for cat in tops:
-        token = _stash(ctx, {"top_name": cat.name, "top_url": cat.url})
-        row.append((cat.name, f"vvt:top:{token}"))
+        token = _stash(ctx, {"top_name": cat.name, "top_slug": cat.slug, "top_uuid": cat.uuid})
+        row.append((_label(cat.name, cat.lot_count), f"vvt:top:{token}"))
         if len(row) == 2:
             rows.append(row); row = []
     if row:
@@ -64,12 +73,21 @@ async def vavato_pick_top(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         await q.edit_message_text("Session expired. Send /vavato again.")
         return
 
-    s = VavatoScraper()
-    subs = await s.list_subcategories(payload["top_url"])
+    top_slug, top_uuid = payload["top_slug"], payload["top_uuid"]
+    subs = [
+        VSubCategory(name=c.name, top_slug=c.parent_slug, sub_slug=c.slug, uuid=c.uuid, url=c.url, lot_count=c.lot_count)
+        for c in await load_subs(VavatoScraper.source, top_slug)
+    ]
+    if not subs:
+        try:
+            subs = await VavatoScraper(interactive=True).list_subcategories(top_slug, top_uuid)
+        except Exception:
+            subs = []
 
     if not subs:
         # No subcats → let user fetch lots directly from the top page
-        t2 = _stash(ctx, {"mode_payload": {"url": payload["top_url"], "name": payload["top_name"]}})
+        top_url = f"{VavatoScraper.base_url}/en/c/{top_slug}/{top_uuid}"
+        t2 = _stash(ctx, {"mode_payload": {"url": top_url, "name": payload["top_name"], "category": top_slug}})
         rows = [[("Latest 10", f"vvt:mode:{t2}:L"),
                  ("Top 10 (flip score)", f"vvt:mode:{t2}:T")]]
         await q.edit_message_text(
@@ -81,8 +99,8 @@ async def vavato_pick_top(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
 
     labels = []
     for sc in subs:
-        t2 = _stash(ctx, {"sub_name": sc.name, "sub_url": sc.url})
-        labels.append((sc.name[:35], f"vvt:sub:{t2}"))
+        t2 = _stash(ctx, {"sub_name": sc.name, "sub_url": sc.url, "category": f"{sc.top_slug}/{sc.sub_slug}"})
+        labels.append((_label(sc.name, sc.lot_count), f"vvt:sub:{t2}"))
 
     rows = [labels[i:i+2] for i in range(0, len(labels), 2)]
     await q.edit_message_text(
@@ -100,7 +118,7 @@ async def vavato_pick_sub(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         await q.edit_message_text("Session expired. Send /vavato again.")
         return
 
-    t2 = _stash(ctx, {"mode_payload": {"url": payload["sub_url"], "name": payload["sub_name"]}})
+    t2 = _stash(ctx, {"mode_payload": {"url": payload["sub_url"], "name": payload["sub_name"], "category": payload["category"]}})
     rows = [[("Latest 10", f"vvt:mode:{t2}:L"),
              ("Top 10 (flip score)", f"vvt:mode:{t2}:T")]]
     await q.edit_message_text(
@@ -119,8 +137,9 @@ async def vavato_show_mode(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
         return
     payload = container["mode_payload"]
 
-    s = VavatoScraper()
-    raws = await s.fetch_lots_from_url(payload["url"], limit=MAX_MEDIA)
+    s = VavatoScraper(interactive=True)
+    url = payload["url"].split("?")[0] + s.listing_query
+    raws = await s.fetch_lots_from_url(url, category=payload["category"], limit=MAX_MEDIA)
 
     # persist + normalize
     await upsert_listings(raws, settings.BASE_LAT, settings.BASE_LON)
@@ -135,31 +154,19 @@ async def vavato_show_mode(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
 # ---------------------- presentation helpers ----------------------
 
 async def _send_cards(update: Update, snaps: list[dict]):
-    chat_id = update.effective_chat.id
-    media, texts = [], []
-    for it in snaps[:MAX_MEDIA]:
-        cap = _fmt_card(it)
-        if it.get("photo_url"):
-            media.append(InputMediaPhoto(media=it["photo_url"], caption=cap, parse_mode=ParseMode.MARKDOWN))
-        else:
-            texts.append(cap)
-
-    if media:
-        try:
-            await update.get_bot().send_media_group(chat_id=chat_id, media=media)
-        except Exception:
-            for m in media:
-                await update.get_bot().send_photo(chat_id=chat_id, photo=m.media, caption=m.caption, parse_mode=ParseMode.MARKDOWN)
-
-    for t in texts:
-        await update.get_bot().send_message(chat_id=chat_id, text=t, parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=False)
+    chat_id, bot = update.effective_chat.id, update.get_bot()
+    cards = [Card(_fmt_card(it), it.get("photo_url")) for it in snaps[:MAX_MEDIA]]
+    await send_cards(bot, chat_id, cards, PRIORITY_INTERACTIVE)
 
     lines = []
     for i, it in enumerate(snaps[:MAX_MEDIA], start=1):
         price = f"€{it.get('price_eur', 0):,.0f}".replace(",", " ")
         lines.append(f"{i}. [{it['title'][:70]}]({it['url']}) — *{price}*")
     if lines:
-        await update.get_bot().send_message(chat_id=chat_id, text="**Summary**\n" + "\n".join(lines), parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True)
+        await delivery.send(chat_id, partial(
+            bot.send_message, chat_id=chat_id, text="**Summary**\n" + "\n".join(lines),
+            parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True,
+        ), PRIORITY_INTERACTIVE)
 
 def _fmt_card(it: dict) -> str:
     parts = [f"*{it['title'][:100]}*", f"[Open listing]({it['url']}) • _{it['source']}_"]
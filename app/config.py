@@ -11,6 +11,15 @@ class Settings(BaseSettings):
     BASE_LON: float = 5.3698
 
     DATABASE_URL: str = "sqlite+sqlite:///./radar.db"
+    READ_DATABASE_URL: str = ""  # optional read replica (non-SQLite); SQLite gets its own read pool
+    DB_READ_POOL_SIZE: int = 5
+
+    # SQLite profile applied on every connection
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_TEMP_STORE: str = "MEMORY"
 
     LOG_LEVEL: str = "INFO"
     HOURLY_SCRAPE_MINUTE: int = 7
@@ -22,6 +31,83 @@ class Settings(BaseSettings):
     DEFAULT_SHIP_EUR_PER_KG: float = 1.8
     DEFAULT_FIXED_SHIP_EUR: float = 25.0
 
+    # Shared HTTP client pool (per host)
+    HTTP_HTTP2: bool = True
+    HTTP_TIMEOUT_S: float = 20.0
+    HTTP_CONNECT_TIMEOUT_S: float = 10.0
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE: int = 10
+    HTTP_KEEPALIVE_EXPIRY_S: float = 60.0
+
+    # Per-host scrape governor
+    SCRAPE_RATE_PER_HOST: float = 4.0
+    SCRAPE_BURST_PER_HOST: int = 8
+    SCRAPE_MAX_IN_FLIGHT_PER_HOST: int = 4
+
+    # Conditional-GET response cache (TTLs per URL pattern live in app/scrapers/cache.py)
+    HTTP_CACHE_ENABLED: bool = True
+    HTTP_CACHE_DIR: str = "./.cache/http"
+    HTTP_CACHE_MEMORY_ENTRIES: int = 256
+    HTTP_CACHE_SWR_S: int = 6 * 3600
+
+    # Hourly category sweep
+    CRAWL_CONCURRENCY: int = 8
+    CRAWL_DEADLINE_S: float = 40 * 60
+    CRAWL_MAX_PAGES: int = 20
+    CATALOG_REFRESH_HOURS: int = 6
+
+    # Lot detail enrichment during the sweep
+    ENRICH_ENABLED: bool = True
+    ENRICH_CONCURRENCY: int = 6
+    ENRICH_CACHE_SIZE: int = 50_000
+
+    # Listing upserts: INSERT ... ON CONFLICT in chunks (false = row-by-row ORM)
+    INGEST_BULK: bool = True
+    INGEST_CHUNK_SIZE: int = 500
+    RAW_COMPRESS: bool = True  # zlib the listing_raw payloads
+    LAST_SEEN_RESOLUTION_S: int = 30 * 60  # unchanged listings: bump last_seen_at at most this often
+
+    # Digest: only lots whose title has one of these words (empty = no gate)
+    DIGEST_GATE_KEYWORDS: str = "sneaker,shoe,trainer,adidas,nike"
+    DIGEST_HWM_OVERLAP_S: int = 300  # re-read listings updated this long before the last digest's high-water mark
+
+    # Telegram delivery queue: bot-wide and per-chat pacing, concurrent senders
+    DELIVERY_RATE_PER_S: float = 30.0
+    DELIVERY_CHAT_INTERVAL_S: float = 1.0
+    DELIVERY_WORKERS: int = 8
+    DELIVERY_MAX_RETRIES: int = 3  # RetryAfter retries per call
+    PHOTO_CACHE_SIZE: int = 50_000  # photo URL -> Telegram file_id kept in memory
+    PHOTO_FAIL_TTL_S: int = 6 * 3600  # photo URLs Telegram could not fetch go out as text for this long
+
+    SEEN_CACHE_USERS: int = 10_000  # users whose seen-state is kept in memory
+
+    # /top leaderboard window (hours)
+    LEADERBOARD_WINDOW_H: int = 24
+
+    # Daily retention: archive + delete listings not seen for RETENTION_DAYS
+    RETENTION_DAYS: int = 30
+    RETENTION_HOUR: int = 3
+    RETENTION_BATCH: int = 2000
+    RETENTION_VACUUM_PAGES: int = 5000
+    ARCHIVE_DIR: str = "./archive"
+
+    # Offline geocoding (GeoNames TSV, e.g. cities1000.txt)
+    GEONAMES_PATH: str = "./data/cities1000.txt"
+    GEONAMES_COUNTRIES: str = ""  # comma-separated ISO codes to keep, empty = all
+    GEONAMES_MIN_POPULATION: int = 0
+    GEOCODE_CACHE_SIZE: int = 20_000
+
+    # HTML parsing off the event loop (0 = parse inline, e.g. for tests)
+    PARSE_WORKERS: int = 2
+    HTML_PARSER: str = "auto"  # auto | selectolax | lxml | html.parser
+
+    # Playwright fallback for pages without server-rendered lots
+    RENDER_ENABLED: bool = False
+    RENDER_CONTEXTS: int = 2
+    RENDER_MAX_PAGES: int = 2
+    RENDER_CONTEXT_MAX_USES: int = 50
+    RENDER_TIMEOUT_S: float = 30.0
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,16 +1,19 @@
 # app/db.py
+import logging
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import text
+from sqlalchemy import text, inspect, event
+from sqlalchemy.engine import make_url
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 # Normalize sync/async URL for SQLite if needed
 def to_async_url(url: str) -> str:
-    if url.startswith("sqlite+sqlite///"):
-        file_path = url.replace("sqlite+sqlite///", "")
-        return f"sqlite+aiosqlite:///{file_path}"
-    if url.startswith("sqlite///"):
-        return url.replace("sqlite///", "sqlite+aiosqlite///")
+    if url.startswith("sqlite+sqlite:///"):
+        return url.replace("sqlite+sqlite:///", "sqlite+aiosqlite:///", 1)
+    if url.startswith("sqlite:///"):
+        return url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
     if url.startswith("postgresql://"):
         return url.replace("postgresql://", "postgresql+asyncpg://")
     if url.startswith("postgresql+psycopg://"):
@@ -18,16 +21,115 @@ def to_async_url(url: str) -> str:
     return url
 
 ASYNC_DATABASE_URL = to_async_url(settings.DATABASE_URL)
+_url = make_url(ASYNC_DATABASE_URL)
+IS_SQLITE = _url.get_backend_name() == "sqlite"
+_SQLITE_FILE = IS_SQLITE and _url.database not in (None, "", ":memory:")
+
+# applied to every new SQLite connection; journal_mode=WAL is persistent, the rest per connection
+SQLITE_PRAGMAS = {
+    "auto_vacuum": "INCREMENTAL",  # only sticks on a new file; retention VACUUMs existing ones once
+    "journal_mode": "WAL",
+    "synchronous": settings.SQLITE_SYNCHRONOUS,
+    "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+    "mmap_size": settings.SQLITE_MMAP_SIZE,
+    "cache_size": -settings.SQLITE_CACHE_SIZE_KB,  # negative = KiB rather than pages
+    "temp_store": settings.SQLITE_TEMP_STORE,
+}
+
+def _sqlite_profile(read_only: bool):
+    def on_connect(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cur.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cur.execute("PRAGMA query_only=ON")
+        cur.close()
+    return on_connect
 
 engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, future=True)
+if _SQLITE_FILE:
+    # WAL lets readers run next to the ingest writer, as long as they use their own connections
+    read_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, future=True, pool_size=settings.DB_READ_POOL_SIZE)
+    event.listen(engine.sync_engine, "connect", _sqlite_profile(read_only=False))
+    event.listen(read_engine.sync_engine, "connect", _sqlite_profile(read_only=True))
+elif settings.READ_DATABASE_URL:
+    read_engine = create_async_engine(to_async_url(settings.READ_DATABASE_URL), echo=False, future=True)
+else:
+    read_engine = engine
+
+def dialect_insert():
+    """insert() with on_conflict_* support for this database, or None (then callers fall back to the ORM)."""
+    if engine.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    return None
+
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+# bot menus, /top, digests: never queue behind the ingest write transaction
+ReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False, class_=AsyncSession)
 
 class Base(DeclarativeBase):
     pass
 
+def _add_missing_columns(sync_conn):
+    """create_all() never alters existing tables: add new nullable columns in place."""
+    insp = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        if not insp.has_table(table.name):
+            continue
+        have = {c["name"] for c in insp.get_columns(table.name)}
+        for col in table.columns:
+            if col.name in have or not col.nullable:
+                continue
+            ddl = col.type.compile(dialect=sync_conn.dialect)
+            sync_conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {col.name} {ddl}'))
+        for idx in table.indexes:
+            idx.create(sync_conn, checkfirst=True)
+
+def _move_inline_raw(sync_conn):
+    """One-off: listings.raw used to hold the payload inline; move it to listing_raw and drop the column."""
+    insp = inspect(sync_conn)
+    if "raw" not in {c["name"] for c in insp.get_columns("listings")}:
+        return
+    import json
+    from datetime import datetime, timezone
+    from app.models import ListingRaw
+    from app.services.raw_store import pack
+    now = datetime.now(timezone.utc)
+    rows = sync_conn.execute(text("SELECT source, external_id, raw FROM listings WHERE raw IS NOT NULL"))
+    while batch := rows.fetchmany(1000):
+        payloads = []
+        for source, external_id, raw in batch:
+            data, codec = pack(json.loads(raw) if isinstance(raw, str) else raw)
+            payloads.append(dict(source=source, external_id=external_id, codec=codec, data=data, updated_at=now))
+        sync_conn.execute(ListingRaw.__table__.insert(), payloads)
+    sync_conn.execute(text("ALTER TABLE listings DROP COLUMN raw"))
+    logger.info("moved listings.raw into listing_raw")
+
 async def init_db():
-    from app.models import Listing, User, Watch, UserSeen
+    from app.models import Listing, ListingRaw, User, Watch, UserSeen, UserSeenState, CrawlCursor, Category, GeocodeCache
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_move_inline_raw)
+        from app.services.search import ensure_search_index
+        await conn.run_sync(ensure_search_index)
     async with engine.connect() as conn:
         await conn.execute(text("SELECT 1"))
+    if IS_SQLITE:
+        await _log_sqlite_profile()
+
+async def _log_sqlite_profile():
+    """Read the pragmas back: a profile that silently did not apply is worse than none."""
+    for name, eng in (("write", engine), ("read", read_engine)):
+        async with eng.connect() as conn:
+            effective = {
+                p: (await conn.exec_driver_sql(f"PRAGMA {p}")).scalar()
+                for p in (*SQLITE_PRAGMAS, "query_only")
+            }
+        logger.info("sqlite %s profile: %s", name, effective)
+        if str(effective["journal_mode"]).lower() != "wal" and _SQLITE_FILE:
+            logger.warning("sqlite %s connection is not in WAL mode; readers will block on ingest", name)
@@ -1,9 +1,13 @@
 # app/jobs/scheduler.py
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from datetime import datetime, timezone
 from telegram import Bot
 from app.services.alerts import send_hourly_digest
 from app.workers import run_scrape_cycle
+from app.services.catalog import refresh_catalog
+from app.services.retention import run_retention
 from app.config import settings
 
 async def start_scheduler(bot: Bot) -> AsyncIOScheduler:
@@ -15,5 +19,13 @@ async def start_scheduler(bot: Bot) -> AsyncIOScheduler:
         CronTrigger(minute=(settings.HOURLY_SCRAPE_MINUTE + 2) % 60),
         args=[bot],
     )
+    # category menus: refresh now in the background, then periodically
+    sched.add_job(
+        refresh_catalog,
+        IntervalTrigger(hours=settings.CATALOG_REFRESH_HOURS),
+        next_run_time=datetime.now(timezone.utc),
+    )
+    # archive + prune once a day, away from the hourly scrape/digest slots
+    sched.add_job(run_retention, CronTrigger(hour=settings.RETENTION_HOUR, minute=(settings.HOURLY_SCRAPE_MINUTE + 30) % 60))
     sched.start()
     return sched
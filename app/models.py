@@ -1,6 +1,6 @@
 # app/models.py
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, Float, DateTime, ForeignKey, Boolean, JSON, UniqueConstraint, Index, Text
+from sqlalchemy import String, Integer, Float, DateTime, ForeignKey, Boolean, UniqueConstraint, Index, Text, LargeBinary
 from datetime import datetime, timezone
 from typing import Optional
 from app.db import Base
@@ -23,6 +23,7 @@ class Listing(Base):
     unit_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     weight_kg: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     posted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), default=None)
+    closes_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
     price_per_unit: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     price_per_kg: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
@@ -32,14 +33,27 @@ class Listing(Base):
     margin_estimate_eur: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     flip_score: Mapped[Optional[float]] = mapped_column(Float, index=True, nullable=True)
 
-    raw: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    detail_key: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)  # set once enriched, even if nothing was found
+    content_hash: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    last_seen_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)  # last content change
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     __table_args__ = (
         UniqueConstraint("source", "external_id", name="uq_source_external"),
         Index("idx_listings_recent", "created_at"),
+        Index("idx_listings_updated", "updated_at"),
     )
 
+class ListingRaw(Base):
+    """Scraped payload per listing, kept out of the hot listings rows (see app/services/raw_store.py)."""
+    __tablename__ = "listing_raw"
+    source: Mapped[str] = mapped_column(String(50), primary_key=True)
+    external_id: Mapped[str] = mapped_column(String(200), primary_key=True)
+    codec: Mapped[str] = mapped_column(String(8), default="zlib")
+    data: Mapped[bytes] = mapped_column(LargeBinary)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
 class User(Base):
     __tablename__ = "users"
     tg_user_id: Mapped[int] = mapped_column(primary_key=True)
@@ -74,3 +88,56 @@ class UserSeen(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     __table_args__ = (UniqueConstraint("user_id", "listing_id", name="uq_user_listing_seen"),)
+
+class UserSeenState(Base):
+    """Listing ids sent to a user on one UTC day (bucket = days since epoch), varint-packed."""
+    __tablename__ = "user_seen_state"
+    user_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    bucket: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    ids: Mapped[bytes] = mapped_column(LargeBinary)
+
+class CrawlCursor(Base):
+    """Next page to read per (source, category) so an interrupted sweep resumes where it stopped."""
+    __tablename__ = "crawl_cursors"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    source: Mapped[str] = mapped_column(String(50))
+    category: Mapped[str] = mapped_column(String(200))
+    next_page: Mapped[int] = mapped_column(Integer, default=1)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (UniqueConstraint("source", "category", name="uq_cursor_source_category"),)
+
+class Category(Base):
+    """Top (parent_slug == "") and sub categories per source, refreshed in the background."""
+    __tablename__ = "categories"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    source: Mapped[str] = mapped_column(String(50))
+    parent_slug: Mapped[str] = mapped_column(String(200), default="")
+    slug: Mapped[str] = mapped_column(String(200))
+    uuid: Mapped[str] = mapped_column(String(36))
+    name: Mapped[str] = mapped_column(String(200))
+    url: Mapped[str] = mapped_column(Text)
+    lot_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    position: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        UniqueConstraint("source", "parent_slug", "slug", "uuid", name="uq_category"),
+        Index("idx_categories_menu", "source", "parent_slug", "position"),
+    )
+
+class GeocodeCache(Base):
+    """Resolved location names (folded) so known places never hit the gazetteer again."""
+    __tablename__ = "geocode_cache"
+    query: Mapped[str] = mapped_column(String(200), primary_key=True)
+    lat: Mapped[float] = mapped_column(Float)
+    lon: Mapped[float] = mapped_column(Float)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+class PhotoFileId(Base):
+    """Telegram file_id of a listing photo already uploaded once, keyed by a hash of its URL."""
+    __tablename__ = "photo_file_ids"
+    url_hash: Mapped[str] = mapped_column(String(32), primary_key=True)
+    photo_url: Mapped[str] = mapped_column(Text)
+    file_id: Mapped[str] = mapped_column(String(200))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
@@ -1,9 +1,30 @@
 # app/normalizer.py
+import hashlib
+import json
 from app.schemas import RawListing
 from app.utils.geo import haversine_km
 from app.utils.logistics import estimate_shipping_eur, apply_fees
 from app.config import settings
 
+# bump when the derived columns below are computed differently
+NORMALIZER_VERSION = 1
+
+def content_hash(raw: RawListing, base_lat: float, base_lon: float) -> str:
+    """
+    Stable fingerprint of the lot's content and of everything normalize_and_snapshot()
+    derives from it. The category is left out: a lot listed under two categories
+    is seen under both in one sweep, and ingest keeps the first one stored.
+    """
+    payload = json.dumps(
+        [
+            NORMALIZER_VERSION, base_lat, base_lon,
+            settings.DEFAULT_FEES_PCT, settings.DEFAULT_SHIP_EUR_PER_KG, settings.DEFAULT_FIXED_SHIP_EUR,
+            raw.model_dump(mode="json", exclude={"category"}),
+        ],
+        sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
 def normalize_and_snapshot(raw: RawListing, base_lat: float, base_lon: float) -> dict:
     distance_km = haversine_km(base_lat, base_lon, raw.lat, raw.lon)
     price_per_unit = (raw.price_value / raw.unit_count) if (raw.unit_count and raw.unit_count > 0) else None
@@ -44,6 +65,8 @@ def normalize_and_snapshot(raw: RawListing, base_lat: float, base_lon: float) ->
         unit_count=raw.unit_count,
         weight_kg=raw.weight_kg,
         posted_at=raw.posted_at,
+        closes_at=raw.closes_at,
+        detail_key=raw.detail_key,
         price_per_unit=price_per_unit,
         price_per_kg=price_per_kg,
         distance_km=distance_km,
@@ -51,6 +74,5 @@ def normalize_and_snapshot(raw: RawListing, base_lat: float, base_lon: float) ->
         ship_estimate_eur=shipping,
         margin_estimate_eur=margin,
         flip_score=flip_score,
-        raw=raw.model_dump(),
     )
     return snapshot
@@ -18,3 +18,5 @@ class RawListing(BaseModel):
     unit_count: Optional[int] = None
     weight_kg: Optional[float] = None
     posted_at: Optional[datetime] = None
+    closes_at: Optional[datetime] = None
+    detail_key: Optional[str] = None  # card the detail fields were fetched for (app/services/enrich.py)
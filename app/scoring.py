@@ -1,16 +1,20 @@
 # app/scoring.py
 from datetime import datetime, timezone
 
+# (max age in hours, boost) — youngest first; older lots get no boost
+RECENCY_TIERS: list[tuple[float, float]] = [(6, 1.15), (24, 1.08), (72, 1.02)]
+
+def as_utc(dt: datetime) -> datetime:
+    """SQLite hands back naive datetimes; everything we store is UTC."""
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
 def recency_boost(created_at: datetime | None) -> float:
     if not created_at:
         return 1.0
-    age_hours = (datetime.now(timezone.utc) - created_at).total_seconds() / 3600.0
-    if age_hours < 6:
-        return 1.15
-    if age_hours < 24:
-        return 1.08
-    if age_hours < 72:
-        return 1.02
+    age_hours = (datetime.now(timezone.utc) - as_utc(created_at)).total_seconds() / 3600.0
+    for max_age_h, boost in RECENCY_TIERS:
+        if age_hours < max_age_h:
+            return boost
     return 1.0
 
 def final_rank_score(flip_score: float | None, created_at: datetime | None) -> float:
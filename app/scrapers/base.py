@@ -1,18 +1,159 @@
 # app/scrapers/base.py
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 import httpx
-from bs4 import BeautifulSoup  # noqa: F401
-from typing import List
+from app.config import settings
 from app.schemas import RawListing
+from app.scrapers.http import get_client
+from app.scrapers.throttle import governor_for, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from app.scrapers.cache import http_cache, ttl_for, CacheEntry
+from app.scrapers.render import render_available, get_render_pool
+from app.scrapers.detail import LotDetail, parse_lot_detail
+from app.scrapers.parsing import run_parser
+
+logger = logging.getLogger(__name__)
+
+# background revalidations in flight, keyed by URL (also keeps the tasks referenced)
+_revalidating: dict[str, asyncio.Task] = {}
+
+@dataclass
+class CrawlTarget:
+    """One listing page the category sweep should read."""
+    category: str
+    url: str
+
+@dataclass
+class LotPage:
+    """One parsed page of a category listing."""
+    number: int
+    lots: List[RawListing]
+
+def with_page(url: str, page: int) -> str:
+    """Set (or replace) the `page` query parameter of a listing URL."""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != "page"]
+    query.insert(0, ("page", str(page)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
 
 class BaseScraper:
     source = "base"
     base_url = ""
+    listing_query = ""  # appended to category URLs when reading lots
 
-    async def fetch_text(self, url: str, timeout=20) -> str:
-        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True, headers={"User-Agent":"Mozilla/5.0 (compatible; ELR/0.1)"}) as client:
-            r = await client.get(url)
+    def __init__(self, interactive: bool = False):
+        # bot-driven scrapers jump ahead of the hourly crawl in the per-host queue
+        self.priority = PRIORITY_INTERACTIVE if interactive else PRIORITY_BACKGROUND
+
+    async def fetch_text(self, url: str, timeout: float | None = None) -> str:
+        ttl = ttl_for(url) if settings.HTTP_CACHE_ENABLED else 0
+        if ttl <= 0:
+            r = await self._get(url, timeout=timeout)
             r.raise_for_status()
             return r.text
 
+        entry = await http_cache.get(url)
+        if entry is not None:
+            age = entry.age()
+            if age < ttl:
+                return entry.body
+            if self.priority == PRIORITY_INTERACTIVE and age < ttl + settings.HTTP_CACHE_SWR_S:
+                # stale-while-revalidate: answer now, refresh behind the user's back
+                if url not in _revalidating:
+                    task = asyncio.create_task(self._refresh_in_background(url, entry, timeout))
+                    _revalidating[url] = task
+                    task.add_done_callback(lambda _t, u=url: _revalidating.pop(u, None))
+                return entry.body
+        return await self._revalidate(url, entry, timeout, self.priority)
+
+    async def _revalidate(self, url: str, entry: Optional[CacheEntry], timeout: float | None, priority: int) -> str:
+        r = await self._get(url, timeout=timeout, headers=entry.validators() if entry else None, priority=priority)
+        if r.status_code == 304 and entry is not None:
+            entry.stored_at = time.time()
+            await http_cache.put(entry)
+            return entry.body
+        r.raise_for_status()
+        await http_cache.put(
+            CacheEntry(
+                url=url,
+                body=r.text,
+                stored_at=time.time(),
+                etag=r.headers.get("etag"),
+                last_modified=r.headers.get("last-modified"),
+            )
+        )
+        return r.text
+
+    async def _refresh_in_background(self, url: str, entry: CacheEntry, timeout: float | None) -> None:
+        try:
+            await self._revalidate(url, entry, timeout, PRIORITY_BACKGROUND)
+        except Exception:
+            logger.warning("background revalidation failed for %s", url, exc_info=True)
+
+    async def _get(self, url: str, timeout: float | None = None, headers: dict | None = None,
+                   priority: int | None = None) -> httpx.Response:
+        client = get_client(url)
+        kwargs = {"headers": headers} if headers else {}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        async with governor_for(url).slot(self.priority if priority is None else priority):
+            return await client.get(url, **kwargs)
+
+    async def render_text(self, url: str) -> Optional[str]:
+        """Browser-rendered HTML for JS-only pages; None when rendering is disabled or fails."""
+        if not render_available():
+            return None
+        try:
+            async with governor_for(url).slot(self.priority):
+                return await get_render_pool().render(url)
+        except Exception:
+            logger.warning("render failed for %s", url, exc_info=True)
+            return None
+
+    async def fetch_lot_detail(self, url: str) -> LotDetail:
+        html = await self.fetch_text(url)
+        return await run_parser(parse_lot_detail, html)
+
+    async def crawl_targets(self) -> List[CrawlTarget]:
+        """Every category page a full sweep of this source should visit."""
+        raise NotImplementedError
+
+    async def fetch_lots_from_url(self, url: str, category: str | None = None, limit: int | None = 10) -> List[RawListing]:
+        return await self._parse_lots_from_page(url, category=category, limit=limit)
+
+    async def iter_lots(self, target: CrawlTarget, start_page: int = 1, max_pages: int = 20) -> AsyncIterator[LotPage]:
+        """
+        Follow a category's pagination lazily, one parsed page per iteration.
+        Ends on an empty page, on a page identical to the previous one (the site
+        ignored `page`), or after `max_pages`. Callers stop earlier by breaking out.
+        An empty page is rendered in the browser pool only if it is the first one,
+        or if earlier pages needed rendering too: the empty page past the last one
+        is not worth a render on a site that serves its cards in the markup.
+        """
+        previous: set[str] = set()
+        js_only = False
+        for number in range(start_page, start_page + max_pages):
+            url = with_page(target.url, number)
+            lots = await self._parse_lots_from_page(url, category=target.category, limit=None, render=False)
+            if not lots and (number == start_page or js_only):
+                lots = await self._render_lots(url, category=target.category, limit=None)
+                js_only = bool(lots)
+            ids = {r.external_id for r in lots}
+            if not ids or ids == previous:
+                return
+            previous = ids
+            yield LotPage(number=number, lots=lots)
+
+    async def _parse_lots_from_page(self, url: str, category: str | None, limit: int | None = 10,
+                                    render: bool = True) -> List[RawListing]:
+        raise NotImplementedError
+
+    async def _render_lots(self, url: str, category: str | None, limit: int | None = 10) -> List[RawListing]:
+        """Lots of a page rendered in the browser pool; [] when rendering is off or fails."""
+        raise NotImplementedError
+
     async def search(self, keywords: list[str]) -> List[RawListing]:
         raise NotImplementedError
@@ -0,0 +1,97 @@
+# app/scrapers/cache.py
+"""On-disk HTTP response cache with per-URL TTLs and ETag/Last-Modified revalidation."""
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+from app.config import settings
+
+# (pattern, ttl seconds) — first match wins; unmatched URLs are not cached
+TTL_RULES: list[tuple[re.Pattern, int]] = [
+    (re.compile(r"^https://www\.vavato\.com/en/?$"), 6 * 3600),      # homepage / top categories
+    (re.compile(r"/en/c/[^/?]+/[0-9a-fA-F-]{36}/?$"), 30 * 60),       # top category pages (subcategory links)
+    (re.compile(r"/en/c/"), 10 * 60),                                 # listing pages
+    (re.compile(r"/en/(l|lots)/"), 30 * 60),                          # lot detail pages
+]
+
+
+def ttl_for(url: str) -> int:
+    for pattern, ttl in TTL_RULES:
+        if pattern.search(url):
+            return ttl
+    return 0
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    body: str
+    stored_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    def validators(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    def __init__(self, directory: str, memory_entries: int = 256):
+        self.directory = directory
+        self.memory_entries = memory_entries
+        self._mem: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    def _path(self, url: str) -> str:
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + ".json")
+
+    def _remember(self, entry: CacheEntry) -> None:
+        self._mem[entry.url] = entry
+        self._mem.move_to_end(entry.url)
+        while len(self._mem) > self.memory_entries:
+            self._mem.popitem(last=False)
+
+    def _read_disk(self, url: str) -> Optional[CacheEntry]:
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                return CacheEntry(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _write_disk(self, entry: CacheEntry) -> None:
+        path = self._path(entry.url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(asdict(entry), f)
+        os.replace(tmp, path)
+
+    async def get(self, url: str) -> Optional[CacheEntry]:
+        entry = self._mem.get(url)
+        if entry is None:
+            entry = await asyncio.to_thread(self._read_disk, url)
+            if entry is None:
+                return None
+        self._remember(entry)
+        return entry
+
+    async def put(self, entry: CacheEntry) -> None:
+        self._remember(entry)
+        await asyncio.to_thread(self._write_disk, entry)
+
+
+http_cache = HttpCache(settings.HTTP_CACHE_DIR, settings.HTTP_CACHE_MEMORY_ENTRIES)
@@ -0,0 +1,230 @@
+# app/scrapers/detail.py
+"""
+Lot detail-page extraction shared by both sources (same auction platform):
+structured data first (JSON-LD, __NEXT_DATA__), visible-text patterns as fallback.
+Both only look at the lot itself: its own JSON node, and its own section of the
+page, so related lots, shipping blurbs and site chrome cannot leak numbers in.
+Pure functions, run in the parse pool.
+"""
+from __future__ import annotations
+import json
+import re
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from app.scrapers.html import parse_html
+
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+
+@dataclass
+class LotDetail:
+    location_name: Optional[str] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    weight_kg: Optional[float] = None
+    unit_count: Optional[int] = None
+    posted_at: Optional[datetime] = None
+    closes_at: Optional[datetime] = None
+
+    def as_update(self) -> dict:
+        """Only the fields that were found, for RawListing.model_copy(update=...)."""
+        return {k: v for k, v in self.__dict__.items() if v is not None}
+
+
+LAT_KEYS = ("latitude", "lat")
+LON_KEYS = ("longitude", "lon", "lng")
+CITY_KEYS = ("city", "addressLocality", "locality", "town")
+COUNTRY_KEYS = ("countryCode", "country", "addressCountry")
+CLOSE_KEYS = ("endDate", "closingDate", "closingTime", "endTime", "endAt", "bidsCloseAt", "closesAt", "availabilityEnds")
+OPEN_KEYS = ("startDate", "startTime", "startAt", "openingDate", "publishedAt", "availabilityStarts")
+WEIGHT_KEYS = ("weightKg", "weight", "grossWeight")
+UNIT_KEYS = ("unitCount", "quantity", "numberOfItems", "units", "pieces")
+
+# where the lot's own object sits: pageProps.<key> in __NEXT_DATA__, an @type in JSON-LD
+LOT_NODE_KEYS = ("lot", "lotDetails", "lotDetail", "lotData")
+LOT_LD_TYPES = frozenset({"Product", "IndividualProduct", "Offer", "Event", "SaleEvent"})
+# branches of the lot node that hold other lots
+SKIP_KEY_RE = re.compile(r"related|similar|recommend|suggest|otherLots|moreLots|nextLot|previousLot|neighbou?r", re.I)
+# the lot's section of the page, most specific first; the whole page when none matches
+LOT_SECTION_CSS = (
+    "[data-testid='lot-details']", "[data-testid='lot-description']", "[data-testid*='lot-detail']",
+    "#lot-details", "#description", "main article", "main",
+)
+
+WALK_MAX_NODES = 20_000
+
+LOCATION_TEXT_RE = re.compile(r"(?:Location|Lot location|Pickup location|Viewing location)\s*:?\s*([A-Z][^\n|•]{2,80}?)(?=\s{2,}|\s*(?:Show|Closes|Closing|Bid|€|$))")
+WEIGHT_TEXT_RE = re.compile(
+    r"\b(?:(?:net|gross|total)\s+)?(?:weight|gewicht|poids)\s*(?:\(kg\))?\s*:?\s*(?:approx\.?|ca\.?|±|~)?\s*"
+    r"(\d+(?:[.,]\d+)?)\s*(kg|kilo(?:gram)?s?|tonnes?|tons?)\b",
+    re.I,
+)
+UNITS_TEXT_RE = re.compile(r"\b(\d{1,6})\s*(?:pcs|pieces|pairs|units|items|stuks|pièces|paires)\b", re.I)
+CLOSES_TEXT_RE = re.compile(r"(?:Closes|Closing|Ends|Closing date)\s*:?\s*([0-9A-Za-z ,.:/-]{6,40})")
+
+
+def _loads(raw: str) -> Any:
+    return _orjson.loads(raw) if _orjson is not None else json.loads(raw)
+
+
+def _script_bodies(html: str, marker: str) -> list[str]:
+    out, pos = [], 0
+    while True:
+        i = html.find(marker, pos)
+        if i < 0:
+            return out
+        start = html.find(">", i)
+        end = html.find("</script>", start)
+        if start < 0 or end < 0:
+            return out
+        out.append(html[start + 1:end])
+        pos = end
+
+
+def _first(d: dict, keys: tuple[str, ...]) -> Any:
+    for k in keys:
+        v = d.get(k)
+        if v not in (None, ""):
+            return v
+    return None
+
+
+def _to_float(v: Any) -> Optional[float]:
+    if isinstance(v, dict):
+        v = v.get("value") or v.get("amount")
+    try:
+        return float(str(v).replace(",", "."))
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_datetime(v: Any) -> Optional[datetime]:
+    if isinstance(v, (int, float)) and v > 0:
+        return datetime.fromtimestamp(v / 1000 if v > 1e11 else v, tz=timezone.utc)
+    if isinstance(v, str):
+        try:
+            dt = datetime.fromisoformat(v.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        # in UTC, as the DB hands it back, so a row refilled from storage hashes the same
+        return dt.astimezone(timezone.utc) if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+    return None
+
+
+def _children(d: dict) -> list[tuple[str, Any]]:
+    return [(k, v) for k, v in d.items() if isinstance(v, (dict, list)) and not SKIP_KEY_RE.search(k)]
+
+
+def _lot_node(data: Any) -> Optional[dict]:
+    """The lot's own object in a parsed script, or None when the script has none."""
+    queue, visited = deque([data]), 0
+    while queue and visited < WALK_MAX_NODES:
+        cur = queue.popleft()
+        visited += 1
+        if isinstance(cur, list):
+            queue.extend(cur)
+            continue
+        if not isinstance(cur, dict):
+            continue
+        types = cur.get("@type")
+        if any(t in LOT_LD_TYPES for t in (types if isinstance(types, list) else [types])):
+            return cur
+        for k in LOT_NODE_KEYS:
+            if isinstance(cur.get(k), dict):
+                return cur[k]
+        queue.extend(v for _, v in _children(cur))
+    return None
+
+
+def _fill_from_json(node: Any, d: LotDetail) -> None:
+    """
+    Bounded breadth-first walk of the lot node: the shallowest dict carrying each
+    kind of field wins. Generic keys (quantity, startDate, ...) count only on the
+    lot node itself (and its JSON-LD offers), not on nested auction, seller or
+    location objects.
+    """
+    queue, visited = deque([(node, True)]), 0
+    while queue and visited < WALK_MAX_NODES:
+        cur, own = queue.popleft()
+        visited += 1
+        if isinstance(cur, list):
+            queue.extend((v, own) for v in cur)
+            continue
+        if not isinstance(cur, dict):
+            continue
+        if d.lat is None:
+            lat, lon = _to_float(_first(cur, LAT_KEYS)), _to_float(_first(cur, LON_KEYS))
+            if lat is not None and lon is not None and -90 <= lat <= 90 and -180 <= lon <= 180:
+                d.lat, d.lon = lat, lon
+        if d.location_name is None:
+            city = _first(cur, CITY_KEYS)
+            if isinstance(city, str):
+                country = _first(cur, COUNTRY_KEYS)
+                if isinstance(country, dict):
+                    country = country.get("name")
+                d.location_name = f"{city}, {country}" if isinstance(country, str) else city
+        if d.closes_at is None:
+            d.closes_at = _to_datetime(_first(cur, CLOSE_KEYS))
+        if d.weight_kg is None:
+            w = _to_float(_first(cur, WEIGHT_KEYS))
+            d.weight_kg = w if w and w > 0 else None
+        if own:
+            if d.posted_at is None:
+                d.posted_at = _to_datetime(_first(cur, OPEN_KEYS))
+            if d.unit_count is None:
+                u = _to_float(_first(cur, UNIT_KEYS))
+                d.unit_count = int(u) if u and u >= 1 and u == int(u) else None
+        # a JSON-LD Product's offers describe the lot itself
+        queue.extend((v, own and k == "offers") for k, v in _children(cur))
+
+
+def _lot_section(root):
+    for css in LOT_SECTION_CSS:
+        el = root.select_one(css)
+        if el is not None:
+            return el
+    return root
+
+
+def _fill_from_text(page_text: str, lot_text: str, d: LotDetail) -> None:
+    """Labelled patterns (location, closing time) over the page; bare numbers only from the lot's section."""
+    if d.location_name is None:
+        m = LOCATION_TEXT_RE.search(page_text)
+        if m:
+            d.location_name = m.group(1).strip(" ,")
+    if d.weight_kg is None:
+        m = WEIGHT_TEXT_RE.search(lot_text)
+        if m:
+            w = float(m.group(1).replace(",", "."))
+            d.weight_kg = w * 1000 if m.group(2).lower().startswith("t") else w
+    if d.unit_count is None:
+        m = UNITS_TEXT_RE.search(lot_text)
+        if m:
+            d.unit_count = int(m.group(1))
+    if d.closes_at is None:
+        m = CLOSES_TEXT_RE.search(page_text)
+        if m:
+            import dateparser  # slow import, only needed for this fallback
+            dt = dateparser.parse(m.group(1), settings={"RETURN_AS_TIMEZONE_AWARE": True, "TO_TIMEZONE": "UTC"})
+            d.closes_at = dt
+
+
+def parse_lot_detail(html: str, backend: str | None = None) -> LotDetail:
+    d = LotDetail()
+    for raw in _script_bodies(html, 'id="__NEXT_DATA__"') + _script_bodies(html, "application/ld+json"):
+        try:
+            node = _lot_node(_loads(raw))
+        except Exception:
+            continue
+        if node is not None:
+            _fill_from_json(node, d)
+    if None in (d.location_name, d.weight_kg, d.unit_count, d.closes_at):
+        root = parse_html(html, backend)
+        _fill_from_text(root.text(), _lot_section(root).text(), d)
+    return d
@@ -0,0 +1,148 @@
+# app/scrapers/html.py
+"""
+Minimal DOM interface the scrapers' parsers are written against, with two backends:
+selectolax (lexbor, fast) and BeautifulSoup (lxml when installed, else html.parser).
+Select one with HTML_PARSER = auto | selectolax | lxml | html.parser.
+"""
+from __future__ import annotations
+import re
+from typing import Iterator, Optional, Protocol
+
+from app.config import settings
+
+_SKIP_TEXT_IN = frozenset({"script", "style", "template", "noscript"})
+_TRAILING_COUNT_RE = re.compile(r"^(.*?)\s*\(\s*(\d[\d.,\s]*)\)$")
+
+
+def split_count(label: str) -> tuple[str, Optional[int]]:
+    """'Shoes (1.234)' -> ('Shoes', 1234); labels without a trailing count are returned as-is."""
+    m = _TRAILING_COUNT_RE.match(label)
+    if not m or not m.group(1):
+        return label, None
+    return m.group(1), int(re.sub(r"\D", "", m.group(2)))
+
+
+class Node(Protocol):
+    tag: str
+
+    def select(self, css: str) -> list["Node"]: ...
+    def select_one(self, css: str) -> Optional["Node"]: ...
+    def get(self, attr: str) -> Optional[str]: ...
+    def text(self) -> str: ...
+    def parent(self) -> Optional["Node"]: ...
+    def find_text(self, pattern: re.Pattern) -> Optional[str]: ...
+
+
+# ------------------------------ BeautifulSoup ------------------------------
+
+class SoupNode:
+    __slots__ = ("_el", "tag")
+
+    def __init__(self, el):
+        self._el = el
+        self.tag = el.name
+
+    def select(self, css: str) -> list[SoupNode]:
+        return [SoupNode(e) for e in self._el.select(css)]
+
+    def select_one(self, css: str) -> Optional[SoupNode]:
+        e = self._el.select_one(css)
+        return SoupNode(e) if e is not None else None
+
+    def get(self, attr: str) -> Optional[str]:
+        v = self._el.get(attr)
+        if isinstance(v, list):  # multi-valued attributes such as class
+            v = " ".join(v)
+        return v
+
+    def text(self) -> str:
+        return self._el.get_text(" ", strip=True)
+
+    def parent(self) -> Optional[SoupNode]:
+        p = self._el.parent
+        return SoupNode(p) if p is not None else None
+
+    def find_text(self, pattern: re.Pattern) -> Optional[str]:
+        for s in self._el.strings:
+            if pattern.search(s):
+                return str(s)
+        return None
+
+
+def _soup_parser() -> str:
+    if settings.HTML_PARSER == "html.parser":
+        return "html.parser"
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        return "html.parser"
+    return "lxml"
+
+
+# ------------------------------- selectolax --------------------------------
+
+class LexborNode:
+    __slots__ = ("_el", "tag")
+
+    def __init__(self, el):
+        self._el = el
+        self.tag = el.tag
+
+    def select(self, css: str) -> list[LexborNode]:
+        return [LexborNode(e) for e in self._el.css(css)]
+
+    def select_one(self, css: str) -> Optional[LexborNode]:
+        e = self._el.css_first(css)
+        return LexborNode(e) if e is not None else None
+
+    def get(self, attr: str) -> Optional[str]:
+        attrs = self._el.attributes
+        if attr not in attrs:
+            return None
+        v = attrs[attr]
+        return "" if v is None else v  # valueless attributes, same as BeautifulSoup
+
+    def _strings(self) -> Iterator[str]:
+        for n in self._el.traverse(include_text=True):
+            if n.tag == "-text" and (n.parent is None or n.parent.tag not in _SKIP_TEXT_IN):
+                yield n.text_content
+
+    def text(self) -> str:
+        return " ".join(t for t in (s.strip() for s in self._strings()) if t)
+
+    def parent(self) -> Optional[LexborNode]:
+        p = self._el.parent
+        return LexborNode(p) if p is not None else None
+
+    def find_text(self, pattern: re.Pattern) -> Optional[str]:
+        for s in self._strings():
+            if pattern.search(s):
+                return s
+        return None
+
+
+def _selectolax_available() -> bool:
+    try:
+        import selectolax.lexbor  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# --------------------------------- factory ---------------------------------
+
+def backend_name() -> str:
+    choice = settings.HTML_PARSER
+    if choice in ("auto", "selectolax") and _selectolax_available():
+        return "selectolax"
+    return _soup_parser()
+
+
+def parse_html(html: str, backend: Optional[str] = None) -> Node:
+    """Parse a document and return its root node."""
+    backend = backend or backend_name()
+    if backend == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser
+        return LexborNode(LexborHTMLParser(html).root)
+    from bs4 import BeautifulSoup
+    return SoupNode(BeautifulSoup(html, backend))
@@ -0,0 +1,65 @@
+# app/scrapers/http.py
+"""Process-wide pooled HTTP clients, one per host, shared by scrapers and bot flows."""
+from __future__ import annotations
+import logging
+from urllib.parse import urlsplit
+
+import httpx
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (compatible; ELR/0.1)"
+
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = settings.HTTP_HTTP2 and _http2_available()
+    if settings.HTTP_HTTP2 and not http2:
+        logger.warning("HTTP_HTTP2 is set but 'h2' is not installed; falling back to HTTP/1.1")
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=httpx.Timeout(settings.HTTP_TIMEOUT_S, connect=settings.HTTP_CONNECT_TIMEOUT_S),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_S,
+        ),
+        follow_redirects=True,
+        headers={"User-Agent": USER_AGENT},
+    )
+
+
+def get_client(url: str) -> httpx.AsyncClient:
+    """Return the pooled client for the host of `url`, creating it on first use."""
+    host = urlsplit(url).netloc.lower()
+    client = _clients.get(host)
+    if client is None or client.is_closed:
+        client = _clients[host] = _build_client()
+    return client
+
+
+def open_clients(urls: list[str]) -> None:
+    """Create the pools for the known hosts at startup."""
+    for url in urls:
+        get_client(url)
+
+
+async def close_clients() -> None:
+    """Close every pooled client; called on shutdown."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception:
+            logger.exception("error closing HTTP client")
@@ -0,0 +1,86 @@
+# app/scrapers/parity.py
+"""
+Backend parity check over the saved HTML corpus:
+
+    python -m app.scrapers.parity [fixtures/html]
+
+Runs every parser listed in the corpus manifest under each installed HTML backend,
+fails if any backend's output differs from BeautifulSoup/html.parser, and prints
+the mean parse time per backend.
+"""
+from __future__ import annotations
+import dataclasses
+import importlib
+import json
+import os
+import sys
+import time
+
+from pydantic import BaseModel
+
+from app.scrapers.html import _selectolax_available
+
+REFERENCE = "html.parser"
+ROUNDS = 20
+
+
+def _backends() -> list[str]:
+    found = [REFERENCE]
+    try:
+        import lxml  # noqa: F401
+        found.append("lxml")
+    except ImportError:
+        pass
+    if _selectolax_available():
+        found.append("selectolax")
+    return found
+
+
+def _plain(items) -> list:
+    return [
+        it.model_dump() if isinstance(it, BaseModel) else dataclasses.asdict(it)
+        for it in items
+    ]
+
+
+def run(corpus_dir: str) -> int:
+    with open(os.path.join(corpus_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    backends = _backends()
+    timings = {b: 0.0 for b in backends}
+    failures = 0
+    for case in manifest:
+        with open(os.path.join(corpus_dir, case["file"]), encoding="utf-8") as f:
+            html = f.read()
+        module, name = case["parser"].split(":")
+        parser = getattr(importlib.import_module(module), name)
+
+        expected = None
+        for backend in backends:
+            t0 = time.perf_counter()
+            for _ in range(ROUNDS):
+                out = _plain(parser(html, *case["args"], backend=backend))
+            timings[backend] += (time.perf_counter() - t0) / ROUNDS
+            if expected is None:
+                expected = out
+                if not out:
+                    print(f"WARN {case['file']} {name}: reference parser returned nothing")
+            elif out != expected:
+                failures += 1
+                print(f"FAIL {case['file']} {name}: {backend} differs from {REFERENCE}")
+                for a, b in zip(expected, out):
+                    if a != b:
+                        print(f"  {REFERENCE}: {a}\n  {backend}: {b}")
+                        break
+                if len(expected) != len(out):
+                    print(f"  {len(expected)} vs {len(out)} items")
+
+    print(f"{len(manifest)} cases, {failures} mismatches")
+    for backend, total in timings.items():
+        print(f"  {backend:<12} {total * 1000:8.2f} ms per corpus pass")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(sys.argv[1] if len(sys.argv) > 1 else "fixtures/html"))
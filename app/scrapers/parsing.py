@@ -0,0 +1,49 @@
+# app/scrapers/parsing.py
+"""
+Process pool for HTML parsing. Parsers are pure module-level functions that take
+raw HTML and return picklable results (RawListing, category dataclasses), so
+BeautifulSoup never runs on the event loop shared by the bot, scheduler and web server.
+"""
+from __future__ import annotations
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: the parent runs aiosqlite/httpx threads, which fork does not copy safely
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def run_parser(fn: Callable[..., T], *args) -> T:
+    """Run `fn(*args)` in the parse pool, or inline when PARSE_WORKERS is 0 (tests, debugging)."""
+    if settings.PARSE_WORKERS <= 0:
+        return fn(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), partial(fn, *args))
+
+
+def start_parse_pool() -> None:
+    if settings.PARSE_WORKERS > 0:
+        _get_pool()
+
+
+def shutdown_parse_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
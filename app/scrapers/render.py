@@ -0,0 +1,146 @@
+# app/scrapers/render.py
+"""
+Optional Playwright rendering for pages whose SSR markup has no lot cards.
+One browser, a warm pool of contexts with images/fonts/media/analytics blocked,
+a cap on concurrent pages, and contexts recycled after RENDER_CONTEXT_MAX_USES.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from app.config import settings
+from app.scrapers.http import USER_AGENT
+
+logger = logging.getLogger(__name__)
+
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+BLOCKED_HOST_PARTS = (
+    "google-analytics.", "googletagmanager.", "doubleclick.", "facebook.", "hotjar.",
+    "segment.", "cookiebot.", "onetrust.", "clarity.ms", "criteo.",
+)
+
+
+def render_available() -> bool:
+    if not settings.RENDER_ENABLED:
+        return False
+    try:
+        import playwright.async_api  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@dataclass
+class _Ctx:
+    context: Optional[Any]
+    uses: int = 0
+
+
+class RenderPool:
+    def __init__(self, contexts: int, max_pages: int, max_uses: int, timeout_s: float):
+        self.size = contexts
+        self.max_uses = max_uses
+        self.timeout_ms = int(timeout_s * 1000)
+        self._pages = asyncio.Semaphore(max_pages)
+        self._idle: asyncio.Queue[_Ctx] = asyncio.Queue()
+        self._start_lock = asyncio.Lock()
+        self._playwright = None
+        self._browser = None
+
+    async def _ensure_started(self) -> None:
+        if self._browser is not None:
+            return
+        async with self._start_lock:
+            if self._browser is not None:
+                return
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=True)
+            for _ in range(self.size):
+                self._idle.put_nowait(_Ctx(await self._new_context()))
+            logger.info("render pool started with %d contexts", self.size)
+
+    async def _new_context(self):
+        ctx = await self._browser.new_context(user_agent=USER_AGENT, java_script_enabled=True)
+        await ctx.route("**/*", _block_heavy)
+        return ctx
+
+    async def render(self, url: str) -> str:
+        await self._ensure_started()
+        async with self._pages:
+            slot = await self._idle.get()
+            try:
+                if slot.context is None:
+                    slot.context, slot.uses = await self._new_context(), 0
+                page = await slot.context.new_page()
+                try:
+                    await page.goto(url, wait_until="domcontentloaded", timeout=self.timeout_ms)
+                    try:
+                        await page.wait_for_load_state("networkidle", timeout=self.timeout_ms // 2)
+                    except Exception:
+                        pass  # long-polling pages never go idle; take what has rendered
+                    return await page.content()
+                finally:
+                    await page.close()
+            finally:
+                slot.uses += 1
+                if slot.uses >= self.max_uses and slot.context is not None:
+                    await self._retire(slot)
+                self._idle.put_nowait(slot)
+
+    async def _retire(self, slot: _Ctx) -> None:
+        """Drop a worn context; the next render through this slot opens a fresh one."""
+        try:
+            await slot.context.close()
+        except Exception:
+            logger.debug("closing render context failed", exc_info=True)
+        slot.context = None
+
+    async def close(self) -> None:
+        while not self._idle.empty():
+            slot = self._idle.get_nowait()
+            if slot.context is not None:
+                try:
+                    await slot.context.close()
+                except Exception:
+                    pass
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+async def _block_heavy(route) -> None:
+    req = route.request
+    host = urlsplit(req.url).netloc.lower()
+    if req.resource_type in BLOCKED_RESOURCE_TYPES or any(p in host for p in BLOCKED_HOST_PARTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+_pool: Optional[RenderPool] = None
+
+
+def get_render_pool() -> RenderPool:
+    global _pool
+    if _pool is None:
+        _pool = RenderPool(
+            contexts=settings.RENDER_CONTEXTS,
+            max_pages=settings.RENDER_MAX_PAGES,
+            max_uses=settings.RENDER_CONTEXT_MAX_USES,
+            timeout_s=settings.RENDER_TIMEOUT_S,
+        )
+    return _pool
+
+
+async def close_render_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
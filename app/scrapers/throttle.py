@@ -0,0 +1,128 @@
+# app/scrapers/throttle.py
+"""Per-host request governor: token bucket + max-in-flight with priority lanes."""
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from app.config import settings
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+
+@dataclass
+class WaitStats:
+    count: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+
+    def add(self, waited: float) -> None:
+        self.count += 1
+        self.total_s += waited
+        self.max_s = max(self.max_s, waited)
+
+    def as_dict(self) -> dict:
+        avg = self.total_s / self.count if self.count else 0.0
+        return {"count": self.count, "avg_wait_s": round(avg, 4), "max_wait_s": round(self.max_s, 4)}
+
+
+@dataclass
+class HostGovernor:
+    """
+    Admits requests to one host. A request first waits for a free in-flight slot
+    (lower priority value is served first), then for a token from the bucket.
+    """
+    rate_per_s: float
+    burst: int
+    max_in_flight: int
+    _tokens: float = field(init=False)
+    _last: float = field(init=False)
+    _in_flight: int = field(init=False, default=0)
+    _waiters: list = field(init=False, default_factory=list)
+    _seq: itertools.count = field(init=False, default_factory=itertools.count)
+    _bucket_lock: asyncio.Lock = field(init=False, default_factory=asyncio.Lock)
+    stats: dict[int, WaitStats] = field(init=False, default_factory=dict)
+
+    def __post_init__(self):
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+
+    async def _acquire_slot(self, priority: int) -> None:
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._seq), fut]
+        heapq.heappush(self._waiters, entry)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # slot was handed over right before cancellation: pass it on
+                self._release_slot()
+            else:
+                entry[2] = None
+            raise
+
+    def _release_slot(self) -> None:
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if fut is not None and not fut.done():
+                fut.set_result(None)  # slot transferred, in-flight count unchanged
+                return
+        self._in_flight -= 1
+
+    async def _take_token(self) -> None:
+        async with self._bucket_lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate_per_s)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate_per_s)
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_BACKGROUND):
+        started = time.monotonic()
+        await self._acquire_slot(priority)
+        try:
+            await self._take_token()
+            self.stats.setdefault(priority, WaitStats()).add(time.monotonic() - started)
+            yield
+        finally:
+            self._release_slot()
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": self._in_flight,
+            "queued": sum(1 for w in self._waiters if w[2] is not None),
+            "interactive": self.stats.get(PRIORITY_INTERACTIVE, WaitStats()).as_dict(),
+            "background": self.stats.get(PRIORITY_BACKGROUND, WaitStats()).as_dict(),
+        }
+
+
+_governors: dict[str, HostGovernor] = {}
+
+
+def governor_for(url: str) -> HostGovernor:
+    host = urlsplit(url).netloc.lower()
+    gov = _governors.get(host)
+    if gov is None:
+        gov = _governors[host] = HostGovernor(
+            rate_per_s=settings.SCRAPE_RATE_PER_HOST,
+            burst=settings.SCRAPE_BURST_PER_HOST,
+            max_in_flight=settings.SCRAPE_MAX_IN_FLIGHT_PER_HOST,
+        )
+    return gov
+
+
+def governor_stats() -> dict[str, dict]:
+    """Queue depth and wait times per host, per priority lane."""
+    return {host: gov.snapshot() for host, gov in _governors.items()}
@@ -1,12 +1,14 @@
 # app/scrapers/troostwijk.py
 from __future__ import annotations
+import asyncio
 import re
 from dataclasses import dataclass
 from typing import List, Optional
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
-from app.scrapers.base import BaseScraper
+from app.scrapers.base import BaseScraper, CrawlTarget
+from app.scrapers.parsing import run_parser
+from app.scrapers.html import parse_html, split_count
 from app.schemas import RawListing
 
 UUID_RE = r"[0-9a-fA-F-]{36}"
@@ -16,6 +18,7 @@ class TrooTopCategory:
     name: str
     slug: str
     uuid: str  # REQUIRED for top pages to resolve (slug-only 404s)
+    lot_count: Optional[int] = None
 
 @dataclass
 class TrooSubCategory:
@@ -24,12 +27,15 @@ class TrooSubCategory:
     uuid: str
     name: str
     url: str
+    lot_count: Optional[int] = None
 
 class TroostwijkScraper(BaseScraper):
     source = "troostwijk"
     base_url = "https://www.troostwijkauctions.com"
 
-    # Stable top categories with UUIDs
+    # Known top categories with UUIDs. Only a seed: the `categories` table
+    # (app/services/catalog.py) is refreshed from the site, and this list is
+    # used only while that table is empty and discovery fails.
     TOP_CATEGORIES: list[TrooTopCategory] = [
         TrooTopCategory("Agricultural", "agricultural", "ca789c2c-b997-4f21-81d4-0bf285aca622"),
         TrooTopCategory("Construction & Earthmoving", "construction-and-earthmoving", "f77365fe-eaa8-42d1-97fc-b14d0111160c"),
@@ -44,7 +50,12 @@ class TroostwijkScraper(BaseScraper):
     ]
 
     async def list_top_categories(self) -> list[TrooTopCategory]:
-        return self.TOP_CATEGORIES
+        """Discover top categories from the homepage (anchors like /en/c/<slug>/<uuid>); [] on failure."""
+        try:
+            html = await self.fetch_text(self.base_url + "/en")
+        except Exception:
+            return []
+        return await run_parser(parse_top_categories, html)
 
     async def list_subcategories(self, top_slug: str, top_uuid: str) -> list[TrooSubCategory]:
         """
@@ -53,31 +64,22 @@ class TroostwijkScraper(BaseScraper):
         """
         url = f"{self.base_url}/en/c/{top_slug}/{top_uuid}"
         html = await self.fetch_text(url)
-        soup = BeautifulSoup(html, "html.parser")
-
-        subs: list[TrooSubCategory] = []
-        for a in soup.select("a[href^='/en/c/']"):
-            href = a.get("href") or ""
-            # ex: /en/c/clothing-shoes-accessories/men%27s-clothing/<uuid>
-            m = re.match(rf"^/en/c/{re.escape(top_slug)}/([^/]+)/({UUID_RE})(?:/|$|\?)", href)
-            if not m:
+        return await run_parser(parse_subcategories, html, self.base_url, top_slug)
+
+    async def crawl_targets(self) -> list[CrawlTarget]:
+        """Subcategory pages of every top category; the top page itself when it has none."""
+        tops = await self.list_top_categories() or self.TOP_CATEGORIES
+        results = await asyncio.gather(
+            *(self.list_subcategories(t.slug, t.uuid) for t in tops), return_exceptions=True
+        )
+        targets: list[CrawlTarget] = []
+        for top, subs in zip(tops, results):
+            if isinstance(subs, BaseException) or not subs:
+                targets.append(CrawlTarget(category=top.slug, url=f"{self.base_url}/en/c/{top.slug}/{top.uuid}"))
                 continue
-            sub_slug, uuid = m.group(1), m.group(2)
-            name = a.get_text(" ", strip=True)
-            url_full = urljoin(self.base_url, href)
-
-            # de-dup
-            if not any(sc.sub_slug == sub_slug and sc.uuid == uuid for sc in subs):
-                subs.append(
-                    TrooSubCategory(
-                        top_slug=top_slug,
-                        sub_slug=sub_slug,
-                        uuid=uuid,
-                        name=name,
-                        url=url_full,
-                    )
-                )
-        return subs
+            for sc in subs:
+                targets.append(CrawlTarget(category=f"{sc.top_slug}/{sc.sub_slug}", url=sc.url))
+        return targets
 
     async def fetch_lots_in_category(self, top_slug: str, top_uuid: str, limit: int = 10) -> list[RawListing]:
         """Fallback: fetch lots directly on top category page."""
@@ -88,114 +90,184 @@ class TroostwijkScraper(BaseScraper):
         url = f"{self.base_url}/en/c/{top_slug}/{sub_slug}/{uuid}"
         return await self._parse_lots_from_page(url, category=f"{top_slug}/{sub_slug}", limit=limit)
 
-    async def _parse_lots_from_page(self, url: str, category: str, limit: int = 10) -> list[RawListing]:
+    async def _parse_lots_from_page(self, url: str, category: str, limit: int | None = 10,
+                                    render: bool = True) -> list[RawListing]:
         html = await self.fetch_text(url)
-        soup = BeautifulSoup(html, "html.parser")
+        items = await run_parser(parse_lots, html, self.base_url, category, limit)
+        if not items and render:
+            # no cards in the SSR markup: escalate to the browser pool (if enabled)
+            items = await self._render_lots(url, category, limit)
+        return items
 
-        cards = soup.select("[data-testid='listing']") or soup.select("a[href*='/l/']")
-        items: list[RawListing] = []
+    async def _render_lots(self, url: str, category: str | None, limit: int | None = 10) -> list[RawListing]:
+        rendered = await self.render_text(url)
+        return await run_parser(parse_lots, rendered, self.base_url, category, limit) if rendered else []
 
-        for card in cards:
-            a = card.select_one("a[href*='/l/']") or (card if card.name == "a" else None)
-            if not a:
-                continue
-            href = a.get("href") or ""
-            url_full = urljoin(self.base_url, href)
 
-            title = a.get_text(" ", strip=True)[:180]
-            if not title:
-                continue
+# Optional legacy search kept for keyword flows
+class _LegacyTroostwijkSearch(TroostwijkScraper):
+    async def search(self, keywords: list[str]) -> List[RawListing]:
+        query = "+".join(keywords)
+        url = f"{self.base_url}/en/search?query={query}"
+        html = await self.fetch_text(url)
+        return await run_parser(parse_search_results, html, self.base_url)
+
+
+# ---------------- pure parsers (run in the parse pool) ----------------
+
+TOP_HREF_RE = re.compile(rf"^/en/c/([^/]+)/({UUID_RE})(?:/|$|\?)")
+SUBCAT_HREF_RE = re.compile(rf"^/en/c/([^/]+)/([^/]+)/({UUID_RE})(?:/|$|\?)")
+LOT_ID_RE = re.compile(r"/l/[^/]+-(A1-[\d-]+)")
+LOT_ID_FALLBACK_RE = re.compile(r"/l/.*?-(\d+)")
+EURO_RE = re.compile("€")
+PRICE_RE = re.compile(r"€\s*([0-9]+(?:\.[0-9]+)?)")
+
 
-            m = re.search(r"/l/[^/]+-(A1-[\d-]+)", href) or re.search(r"/l/.*?-(\d+)", href)
-            external_id = m.group(1) if m else href
+def parse_top_categories(html: str, backend: str | None = None) -> list[TrooTopCategory]:
+    root = parse_html(html, backend)
+    found: dict[tuple[str, str], TrooTopCategory] = {}
+    for a in root.select("a[href^='/en/c/']"):
+        m = TOP_HREF_RE.match(a.get("href") or "")
+        if not m:
+            continue
+        slug, uuid = m.group(1), m.group(2)
+        name, lot_count = split_count(a.text())
+        if (slug, uuid) not in found:
+            found[(slug, uuid)] = TrooTopCategory(name=name or slug.replace("-", " ").title(), slug=slug, uuid=uuid,
+                                                  lot_count=lot_count)
+    return list(found.values())
 
-            img_el = card.select_one("img")
-            photo = None
-            if img_el:
-                photo = img_el.get("src") or img_el.get("data-src") or img_el.get("data-srcset")
-                if photo and photo.startswith("//"):
-                    photo = "https:" + photo
 
-            price_el = card.find(string=re.compile(r"€")) or card.find("span", string=re.compile("€"))
-            price_value = _parse_price(str(price_el)) if price_el else 0.0
+def parse_subcategories(html: str, base_url: str, top_slug: str, backend: str | None = None) -> list[TrooSubCategory]:
+    root = parse_html(html, backend)
 
-            items.append(
-                RawListing(
-                    source=self.source,
-                    external_id=external_id,
+    subs: list[TrooSubCategory] = []
+    for a in root.select("a[href^='/en/c/']"):
+        href = a.get("href") or ""
+        # ex: /en/c/clothing-shoes-accessories/men%27s-clothing/<uuid>
+        m = SUBCAT_HREF_RE.match(href)
+        if not m or m.group(1) != top_slug:
+            continue
+        sub_slug, uuid = m.group(2), m.group(3)
+        name, lot_count = split_count(a.text())
+        url_full = urljoin(base_url, href)
+
+        # de-dup
+        if not any(sc.sub_slug == sub_slug and sc.uuid == uuid for sc in subs):
+            subs.append(
+                TrooSubCategory(
+                    top_slug=top_slug,
+                    sub_slug=sub_slug,
+                    uuid=uuid,
+                    name=name,
                     url=url_full,
-                    title=title,
-                    category=category,
-                    location_name=None,
-                    lat=None,
-                    lon=None,
-                    photo_url=photo,
-                    currency="EUR",
-                    price_value=price_value,
-                    unit_count=None,
-                    weight_kg=None,
-                    posted_at=None,
+                    lot_count=lot_count,
                 )
             )
-            if len(items) >= limit:
-                break
-        return items
+    return subs
 
 
-# Optional legacy search kept for keyword flows
-class _LegacyTroostwijkSearch(TroostwijkScraper):
-    async def search(self, keywords: list[str]) -> List[RawListing]:
-        query = "+".join(keywords)
-        url = f"{self.base_url}/en/search?query={query}"
-        html = await self.fetch_text(url)
-        soup = BeautifulSoup(html, "html.parser")
+def parse_lots(html: str, base_url: str, category: str, limit: int | None = 10, backend: str | None = None) -> list[RawListing]:
+    root = parse_html(html, backend)
 
-        items = []
-        for card in soup.select("[data-testid='listing'] a[href*='/l/']"):
-            href = card.get("href")
-            title = card.get_text(" ", strip=True)
-            if not href or not title:
-                continue
-            m = re.search(r"/l/[^/]+-(A1-[\d-]+)", href) or re.search(r"/l/.*?-(\d+)", href)
-            external_id = m.group(1) if m else href
-
-            parent = card.find_parent()
-            price_text = None
-            img = None
-            if parent:
-                price_el = parent.find(string=re.compile(r"€"))
-                price_text = str(price_el) if price_el else None
-                img_el = parent.select_one("img")
-                img = img_el["src"] if img_el and img_el.has_attr("src") else None
-
-            price_value = _parse_price(price_text) if price_text else 0.0
-
-            items.append(
-                RawListing(
-                    source=self.source,
-                    external_id=external_id,
-                    url=self.base_url + href if href.startswith("/") else href,
-                    title=title,
-                    category="search",
-                    location_name=None,
-                    lat=None,
-                    lon=None,
-                    photo_url=img,
-                    currency="EUR",
-                    price_value=price_value,
-                    unit_count=None,
-                    weight_kg=None,
-                    posted_at=None,
-                )
+    cards = root.select("[data-testid='listing']") or root.select("a[href*='/l/']")
+    items: list[RawListing] = []
+
+    for card in cards:
+        a = card.select_one("a[href*='/l/']") or (card if card.tag == "a" else None)
+        if not a:
+            continue
+        href = a.get("href") or ""
+        url_full = urljoin(base_url, href)
+
+        title = a.text()[:180]
+        if not title:
+            continue
+
+        m = LOT_ID_RE.search(href) or LOT_ID_FALLBACK_RE.search(href)
+        external_id = m.group(1) if m else href
+
+        img_el = card.select_one("img")
+        photo = None
+        if img_el:
+            photo = img_el.get("src") or img_el.get("data-src") or img_el.get("data-srcset")
+            if photo and photo.startswith("//"):
+                photo = "https:" + photo
+
+        price_text = card.find_text(EURO_RE)
+        price_value = _parse_price(price_text) if price_text else 0.0
+
+        items.append(
+            RawListing(
+                source=TroostwijkScraper.source,
+                external_id=external_id,
+                url=url_full,
+                title=title,
+                category=category,
+                location_name=None,
+                lat=None,
+                lon=None,
+                photo_url=photo,
+                currency="EUR",
+                price_value=price_value,
+                unit_count=None,
+                weight_kg=None,
+                posted_at=None,
             )
-        return items
+        )
+        if limit is not None and len(items) >= limit:
+            break
+    return items
+
+
+def parse_search_results(html: str, base_url: str, backend: str | None = None) -> list[RawListing]:
+    root = parse_html(html, backend)
+
+    items = []
+    for card in root.select("[data-testid='listing'] a[href*='/l/']"):
+        href = card.get("href")
+        title = card.text()
+        if not href or not title:
+            continue
+        m = LOT_ID_RE.search(href) or LOT_ID_FALLBACK_RE.search(href)
+        external_id = m.group(1) if m else href
+
+        parent = card.parent()
+        price_text = None
+        img = None
+        if parent:
+            price_text = parent.find_text(EURO_RE)
+            img_el = parent.select_one("img")
+            img = img_el.get("src") if img_el else None
+
+        price_value = _parse_price(price_text) if price_text else 0.0
+
+        items.append(
+            RawListing(
+                source=TroostwijkScraper.source,
+                external_id=external_id,
+                url=base_url + href if href.startswith("/") else href,
+                title=title,
+                category="search",
+                location_name=None,
+                lat=None,
+                lon=None,
+                photo_url=img,
+                currency="EUR",
+                price_value=price_value,
+                unit_count=None,
+                weight_kg=None,
+                posted_at=None,
+            )
+        )
+    return items
 
 
 def _parse_price(text: str | None) -> float:
     if not text:
         return 0.0
     cleaned = str(text).replace("\xa0", " ").replace(".", "").replace(",", ".")
-    m = re.search(r"€\s*([0-9]+(?:\.[0-9]+)?)", cleaned)
+    m = PRICE_RE.search(cleaned)
     try:
         return float(m.group(1)) if m else 0.0
     except Exception:
@@ -1,15 +1,22 @@
 # app/scrapers/vavato.py
 from __future__ import annotations
+import asyncio
 import re
 import json
 from dataclasses import dataclass
-from typing import List, Any
+from typing import List, Any, Optional
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
-from app.scrapers.base import BaseScraper
+from app.scrapers.base import BaseScraper, CrawlTarget
+from app.scrapers.parsing import run_parser
+from app.scrapers.html import Node, parse_html, split_count
 from app.schemas import RawListing
 
+try:
+    import orjson as _orjson
+except ImportError:  # stdlib json is fine, just slower on big pages
+    _orjson = None
+
 UUID_RE = r"[0-9a-fA-F-]{36}"
 
 @dataclass
@@ -17,6 +24,7 @@ class VTopCategory:
     name: str
     slug: str
     uuid: str
+    lot_count: Optional[int] = None
 
 @dataclass
 class VSubCategory:
@@ -25,10 +33,13 @@ class VSubCategory:
     sub_slug: str
     uuid: str
     url: str
+    lot_count: Optional[int] = None
 
 class VavatoScraper(BaseScraper):
     source = "vavato"
     base_url = "https://www.vavato.com"
+    # hint page params to encourage SSR
+    listing_query = "?page=1&pageSize=24"
 
     # -------------------- category discovery --------------------
 
@@ -38,103 +49,152 @@ class VavatoScraper(BaseScraper):
             html = await self.fetch_text(self.base_url + "/en")
         except Exception:
             return []
-
-        soup = BeautifulSoup(html, "html.parser")
-        found: dict[tuple[str, str], VTopCategory] = {}
-
-        for a in soup.select("a[href^='/en/c/']"):
-            href = a.get("href") or ""
-            m = re.match(rf"^/en/c/([^/]+)/({UUID_RE})(?:/|$|\?)", href)
-            if not m:
-                continue
-            slug, uuid = m.group(1), m.group(2)
-            name = a.get_text(" ", strip=True) or slug.replace("-", " ").title()
-            key = (slug, uuid)
-            if key not in found:
-                found[key] = VTopCategory(name=name, slug=slug, uuid=uuid)
-
-        return list(found.values())
+        return await run_parser(parse_top_categories, html)
 
     async def list_subcategories(self, top_slug: str, top_uuid: str) -> List[VSubCategory]:
         """Scrape /en/c/<top_slug>/<top_uuid> and collect deeper links: /en/c/<top>/<sub>/<uuid>."""
         url = f"{self.base_url}/en/c/{top_slug}/{top_uuid}"
         html = await self.fetch_text(url)
-        soup = BeautifulSoup(html, "html.parser")
-
-        subs: dict[tuple[str, str], VSubCategory] = {}
-        for a in soup.select("a[href^='/en/c/']"):
-            href = a.get("href") or ""
-            m = re.match(rf"^/en/c/{re.escape(top_slug)}/([^/]+)/({UUID_RE})(?:/|$|\?)", href)
-            if not m:
+        return await run_parser(parse_subcategories, html, self.base_url, top_slug)
+
+    async def crawl_targets(self) -> List[CrawlTarget]:
+        """Walk the category tree discovered from the homepage."""
+        tops = await self.list_top_categories()
+        results = await asyncio.gather(
+            *(self.list_subcategories(t.slug, t.uuid) for t in tops), return_exceptions=True
+        )
+        targets: List[CrawlTarget] = []
+        for top, subs in zip(tops, results):
+            if isinstance(subs, BaseException) or not subs:
+                targets.append(CrawlTarget(
+                    category=top.slug,
+                    url=f"{self.base_url}/en/c/{top.slug}/{top.uuid}{self.listing_query}",
+                ))
                 continue
-            sub_slug, uuid = m.group(1), m.group(2)
-            name = a.get_text(" ", strip=True) or sub_slug.replace("-", " ").title()
-            key = (sub_slug, uuid)
-            if key not in subs:
-                subs[key] = VSubCategory(
-                    name=name,
-                    top_slug=top_slug,
-                    sub_slug=sub_slug,
-                    uuid=uuid,
-                    url=urljoin(self.base_url, href),
-                )
-        return list(subs.values())
+            for sc in subs:
+                targets.append(CrawlTarget(
+                    category=f"{sc.top_slug}/{sc.sub_slug}",
+                    url=f"{sc.url.split('?')[0]}{self.listing_query}",
+                ))
+        return targets
 
     # ------------------------ lot fetching ------------------------
 
     async def fetch_lots_in_category(self, top_slug: str, top_uuid: str, limit: int = 10) -> List[RawListing]:
-        # hint page params to encourage SSR
-        url = f"{self.base_url}/en/c/{top_slug}/{top_uuid}?page=1&pageSize=24"
+        url = f"{self.base_url}/en/c/{top_slug}/{top_uuid}{self.listing_query}"
         return await self._parse_lots_from_page(url, category=top_slug, limit=limit)
 
     async def fetch_lots_in_subcategory(self, top_slug: str, sub_slug: str, uuid: str, limit: int = 10) -> List[RawListing]:
-        url = f"{self.base_url}/en/c/{top_slug}/{sub_slug}/{uuid}?page=1&pageSize=24"
+        url = f"{self.base_url}/en/c/{top_slug}/{sub_slug}/{uuid}{self.listing_query}"
         return await self._parse_lots_from_page(url, category=f"{top_slug}/{sub_slug}", limit=limit)
 
-    async def _parse_lots_from_page(self, url: str, category: str, limit: int = 10) -> List[RawListing]:
-        try:
-            html = await self.fetch_text(url)
-        except Exception:
-            return []
+    async def _parse_lots_from_page(self, url: str, category: str, limit: int | None = 10,
+                                    render: bool = True) -> List[RawListing]:
+        # fetch errors propagate: an empty result means the category ended, and the sweep
+        # would clear its cursor over a timeout or a 5xx
+        html = await self.fetch_text(url)
+        items = await run_parser(parse_lots, html, self.base_url, category, limit)
+        if not items and render:
+            # neither cards nor embedded JSON: escalate to the browser pool (if enabled)
+            items = await self._render_lots(url, category, limit)
+        return items
 
-        soup = BeautifulSoup(html, "html.parser")
-        items: list[RawListing] = []
-
-        # 1) Try plain HTML cards first
-        cards = soup.select("[data-testid='lot-card'] a[href^='/en/lots/']") or soup.select("a[href^='/en/lots/']")
-        for a in cards:
-            rl = _raw_from_anchor(self.base_url, a, category)
-            if rl:
-                items.append(rl)
-            if len(items) >= limit:
-                break
-
-        if len(items) >= limit:
-            return items[:limit]
-
-        # 2) Fallback: parse embedded JSON (Next.js) — look for __NEXT_DATA__ or any JSON blob
-        json_items = _extract_lots_from_embedded_json(html, base_url=self.base_url, category=category)
-        for rl in json_items:
-            # avoid duplicates by external_id
-            if any(x.external_id == rl.external_id for x in items):
-                continue
+    async def _render_lots(self, url: str, category: str | None, limit: int | None = 10) -> List[RawListing]:
+        rendered = await self.render_text(url)
+        return await run_parser(parse_lots, rendered, self.base_url, category, limit) if rendered else []
+
+
+# ---------------- pure parsers (run in the parse pool) ----------------
+
+TOP_HREF_RE = re.compile(rf"^/en/c/([^/]+)/({UUID_RE})(?:/|$|\?)")
+SUB_HREF_RE = re.compile(rf"^/en/c/([^/]+)/([^/]+)/({UUID_RE})(?:/|$|\?)")
+EURO_RE = re.compile("€")
+PRICE_RE = re.compile(r"€\s*([0-9]+(?:\.[0-9]+)?)")
+JSON_SCRIPT_RE = re.compile(r'<script[^>]+application/json"[^>]*>\s*(\{.*?\})\s*</script>', re.S)
+
+def parse_top_categories(html: str, backend: str | None = None) -> List[VTopCategory]:
+    root = parse_html(html, backend)
+    found: dict[tuple[str, str], VTopCategory] = {}
+
+    for a in root.select("a[href^='/en/c/']"):
+        href = a.get("href") or ""
+        m = TOP_HREF_RE.match(href)
+        if not m:
+            continue
+        slug, uuid = m.group(1), m.group(2)
+        name, lot_count = split_count(a.text())
+        name = name or slug.replace("-", " ").title()
+        key = (slug, uuid)
+        if key not in found:
+            found[key] = VTopCategory(name=name, slug=slug, uuid=uuid, lot_count=lot_count)
+
+    return list(found.values())
+
+def parse_subcategories(html: str, base_url: str, top_slug: str, backend: str | None = None) -> List[VSubCategory]:
+    root = parse_html(html, backend)
+
+    subs: dict[tuple[str, str], VSubCategory] = {}
+    for a in root.select("a[href^='/en/c/']"):
+        href = a.get("href") or ""
+        m = SUB_HREF_RE.match(href)
+        if not m or m.group(1) != top_slug:
+            continue
+        sub_slug, uuid = m.group(2), m.group(3)
+        name, lot_count = split_count(a.text())
+        name = name or sub_slug.replace("-", " ").title()
+        key = (sub_slug, uuid)
+        if key not in subs:
+            subs[key] = VSubCategory(
+                name=name,
+                top_slug=top_slug,
+                sub_slug=sub_slug,
+                uuid=uuid,
+                url=urljoin(base_url, href),
+                lot_count=lot_count,
+            )
+    return list(subs.values())
+
+def parse_lots(html: str, base_url: str, category: str, limit: int | None = 10, backend: str | None = None) -> List[RawListing]:
+    root = parse_html(html, backend)
+    items: list[RawListing] = []
+
+    # 1) Try plain HTML cards first
+    cards = root.select("[data-testid='lot-card'] a[href^='/en/lots/']") or root.select("a[href^='/en/lots/']")
+    for a in cards:
+        rl = _raw_from_anchor(base_url, a, category)
+        if rl:
             items.append(rl)
-            if len(items) >= limit:
-                break
+        if limit is not None and len(items) >= limit:
+            break
 
+    if limit is not None and len(items) >= limit:
         return items[:limit]
 
+    # 2) Fallback: parse embedded JSON (Next.js) — look for __NEXT_DATA__ or any JSON blob
+    json_items = _extract_lots_from_embedded_json(html, base_url=base_url, category=category)
+    have = {x.external_id for x in items}
+    for rl in json_items:
+        # avoid duplicates by external_id
+        if rl.external_id in have:
+            continue
+        have.add(rl.external_id)
+        items.append(rl)
+        if limit is not None and len(items) >= limit:
+            break
+
+    return items[:limit]
+
 
 # ------------------------- helpers -------------------------
 
-def _raw_from_anchor(base_url: str, a, category: str) -> RawListing | None:
+def _raw_from_anchor(base_url: str, a: Node, category: str) -> RawListing | None:
     href = a.get("href") or ""
     if not href.startswith("/en/lots/"):
         return None
     lot_url = urljoin(base_url, href)
 
     title_el = a.select_one("h3, h2") or a
-    title = title_el.get_text(" ", strip=True)[:180] if title_el else None
+    title = title_el.text()[:180] if title_el else None
     if not title:
         return None
 
@@ -143,7 +203,7 @@ def _raw_from_anchor(base_url: str, a, category: str) -> RawListing | None:
     # image: look in the anchor, then in the parent
     img_el = a.select_one("img")
     if not img_el:
-        parent = a.find_parent()
+        parent = a.parent()
         img_el = parent.select_one("img") if parent else None
     photo = None
     if img_el:
@@ -152,9 +212,9 @@ def _raw_from_anchor(base_url: str, a, category: str) -> RawListing | None:
             photo = "https:" + photo
 
     # price near the anchor/parent
-    host = a.find_parent() or a
-    price_el = host.find(string=re.compile(r"€")) or host.find("span", string=re.compile("€"))
-    price_value = _parse_price(str(price_el)) if price_el else 0.0
+    host = a.parent() or a
+    price_text = host.find_text(EURO_RE)
+    price_value = _parse_price(price_text) if price_text else 0.0
 
     return RawListing(
         source="vavato",
@@ -173,138 +233,206 @@ def _raw_from_anchor(base_url: str, a, category: str) -> RawListing | None:
         posted_at=None,
     )
 
+# Where Next.js pages keep their lot lists; `*` fans out over a list.
+NEXT_DATA_LOT_PATHS: tuple[str, ...] = (
+    "props.pageProps.lots",
+    "props.pageProps.lots.results",
+    "props.pageProps.listData.lots",
+    "props.pageProps.initialData.lots",
+    "props.pageProps.searchResults.lots",
+    "props.pageProps.category.lots",
+    "props.pageProps.dehydratedState.queries.*.state.data.lots",
+    "props.pageProps.dehydratedState.queries.*.state.data.results",
+)
+NEXT_DATA_MARKER = 'id="__NEXT_DATA__"'
+# bounds for the generic fallback walk
+WALK_MAX_NODES = 20_000
+WALK_MAX_DEPTH = 14
+
+def _json_loads(raw: str) -> Any:
+    if _orjson is not None:
+        return _orjson.loads(raw)
+    return json.loads(raw)
+
+def _next_data_blob(html: str) -> str | None:
+    """Slice the __NEXT_DATA__ script body by offset instead of regex-scanning the page."""
+    i = html.find(NEXT_DATA_MARKER)
+    if i < 0:
+        return None
+    start = html.find(">", i)
+    end = html.find("</script>", start)
+    if start < 0 or end < 0:
+        return None
+    return html[start + 1:end]
+
+def _at_path(node: Any, parts: list[str]) -> list[Any]:
+    if not parts:
+        return [node]
+    head, rest = parts[0], parts[1:]
+    if head == "*":
+        if not isinstance(node, list):
+            return []
+        return [hit for it in node for hit in _at_path(it, rest)]
+    if isinstance(node, dict) and head in node:
+        return _at_path(node[head], rest)
+    return []
+
+def _lots_at_known_paths(data: Any) -> list[dict[str, Any]]:
+    out: list[dict[str, Any]] = []
+    for path in NEXT_DATA_LOT_PATHS:
+        for hit in _at_path(data, path.split(".")):
+            if isinstance(hit, list):
+                out.extend(it for it in hit if isinstance(it, dict))
+    return out
+
 def _extract_lots_from_embedded_json(html: str, base_url: str, category: str) -> List[RawListing]:
     """
-    Try to parse data from embedded JSON (Next.js __NEXT_DATA__ or similar).
-    We search for the first large JSON block and walk it for lot-like dicts.
+    Lots from embedded JSON: the __NEXT_DATA__ blob first, read along the known
+    paths above; a bounded heuristic walk only when those paths come up empty.
+    Pages without __NEXT_DATA__ fall back to any <script type="application/json">.
     """
-    lots: list[RawListing] = []
+    blob = _next_data_blob(html)
+    blobs = [blob] if blob else [m.group(1) for m in JSON_SCRIPT_RE.finditer(html)]
 
-    # __NEXT_DATA__ pattern
-    m = re.search(r'<script[^>]+id="__NEXT_DATA__"[^>]*>\s*(\{.*?\})\s*</script>', html, re.S)
-    blobs: list[str] = []
-    if m:
-        blobs.append(m.group(1))
-    else:
-        # fallback: the largest <script type="application/json"> blob
-        for sm in re.finditer(r'<script[^>]+application/json"[^>]*>\s*(\{.*?\})\s*</script>', html, re.S):
-            blobs.append(sm.group(1))
-
-    seen_ids = set()
+    lots: list[RawListing] = []
+    seen_ids: set = set()
     for raw in blobs:
         try:
-            data = json.loads(raw)
+            data = _json_loads(raw)
         except Exception:
             continue
-        # Walk the JSON and pick objects that look like a "lot"
-        candidates: list[dict[str, Any]] = []
-        _walk_json_for_lots(data, candidates)
+        candidates = _lots_at_known_paths(data)
+        if not candidates:
+            _walk_json_for_lots(data, candidates)
 
         for obj in candidates:
-            # title/name
-            title = (
-                obj.get("title")
-                or obj.get("name")
-                or obj.get("lotTitle")
-                or obj.get("lotName")
-            )
-            if not title:
+            rl = _raw_from_json(obj, base_url, category)
+            if rl is None or rl.external_id in seen_ids:
                 continue
+            seen_ids.add(rl.external_id)
+            lots.append(rl)
 
-            # url / slug / id
-            url = (
-                obj.get("url")
-                or obj.get("href")
-                or obj.get("lotUrl")
-            )
-            if url and url.startswith("/"):
-                url = urljoin(base_url, url)
-            if not url:
-                slug = obj.get("slug") or obj.get("lotSlug")
-                lot_id = obj.get("id") or obj.get("lotId") or obj.get("uuid")
-                if slug:
-                    url = urljoin(base_url, f"/en/lots/{slug}")
-                elif lot_id:
-                    url = urljoin(base_url, f"/en/lots/{lot_id}")
-            if not url:
-                continue
+    return lots
 
-            # external id
-            external_id = (
-                obj.get("id")
-                or obj.get("lotId")
-                or obj.get("uuid")
-                or url.strip("/").split("/")[-1]
-            )
-            if external_id in seen_ids:
-                continue
-            seen_ids.add(external_id)
-
-            # image
-            photo = (
-                obj.get("image")
-                or obj.get("imageUrl")
-                or obj.get("thumbnailUrl")
-                or obj.get("mainImageUrl")
-                or _deep_get(obj, "image.src")
-                or _deep_get(obj, "thumbnail.src")
-            )
+def _raw_from_json(obj: dict[str, Any], base_url: str, category: str) -> RawListing | None:
+    # title/name
+    title = (
+        obj.get("title")
+        or obj.get("name")
+        or obj.get("lotTitle")
+        or obj.get("lotName")
+    )
+    if not title:
+        return None
 
-            # price
-            price = (
-                obj.get("price")
-                or obj.get("currentPrice")
-                or obj.get("biddingPrice")
-                or _deep_get(obj, "currentPrice.amount")
-                or _deep_get(obj, "current_price.amount")
-                or _deep_get(obj, "price.amount")
-                or _deep_get(obj, "price.value")
-            )
-            try:
-                price_value = float(str(price).replace(",", "."))
-            except Exception:
-                price_value = 0.0
-
-            lots.append(
-                RawListing(
-                    source="vavato",
-                    external_id=str(external_id),
-                    url=url,
-                    title=str(title)[:180],
-                    category=category,
-                    location_name=None,
-                    lat=None,
-                    lon=None,
-                    photo_url=photo,
-                    currency="EUR",
-                    price_value=price_value,
-                    unit_count=None,
-                    weight_kg=None,
-                    posted_at=None,
-                )
+    # url / slug / id
+    url = (
+        obj.get("url")
+        or obj.get("href")
+        or obj.get("lotUrl")
+    )
+    if url and url.startswith("/"):
+        url = urljoin(base_url, url)
+    if not url:
+        slug = obj.get("slug") or obj.get("lotSlug")
+        lot_id = obj.get("id") or obj.get("lotId") or obj.get("uuid")
+        if slug:
+            url = urljoin(base_url, f"/en/lots/{slug}")
+        elif lot_id:
+            url = urljoin(base_url, f"/en/lots/{lot_id}")
+    if not url:
+        return None
+
+    # external id
+    external_id = (
+        obj.get("id")
+        or obj.get("lotId")
+        or obj.get("uuid")
+        or url.strip("/").split("/")[-1]
+    )
+
+    # image (some payloads nest it as {"src": ...})
+    photo = next(
+        (
+            p for p in (
+                obj.get("image"),
+                obj.get("imageUrl"),
+                obj.get("thumbnailUrl"),
+                obj.get("mainImageUrl"),
+                _deep_get(obj, "image.src"),
+                _deep_get(obj, "thumbnail.src"),
             )
+            if p and isinstance(p, str)
+        ),
+        None,
+    )
 
-    return lots
+    # price
+    price = (
+        obj.get("price")
+        or obj.get("currentPrice")
+        or obj.get("biddingPrice")
+        or _deep_get(obj, "currentPrice.amount")
+        or _deep_get(obj, "current_price.amount")
+        or _deep_get(obj, "price.amount")
+        or _deep_get(obj, "price.value")
+    )
+    if isinstance(price, dict):
+        price = price.get("amount") or price.get("value")
+    try:
+        price_value = float(str(price).replace(",", "."))
+    except Exception:
+        price_value = 0.0
 
-def _walk_json_for_lots(node: Any, out: list[dict[str, Any]]):
-    """Collect dicts that look like lot records."""
-    if isinstance(node, dict):
-        if ("lots" in node and isinstance(node["lots"], list)):
-            for it in node["lots"]:
-                if isinstance(it, dict):
-                    out.append(it)
-        # generic heuristic: dict with id + (title|name) + (image|thumbnail)
-        if (
-            ("id" in node or "uuid" in node or "lotId" in node)
-            and ("title" in node or "name" in node or "lotTitle" in node)
-            and any(k in node for k in ("image", "imageUrl", "thumbnailUrl", "mainImageUrl", "thumbnail"))
-        ):
-            out.append(node)
-        for v in node.values():
-            _walk_json_for_lots(v, out)
-    elif isinstance(node, list):
-        for v in node:
-            _walk_json_for_lots(v, out)
+    return RawListing(
+        source="vavato",
+        external_id=str(external_id),
+        url=url,
+        title=str(title)[:180],
+        category=category,
+        location_name=None,
+        lat=None,
+        lon=None,
+        photo_url=photo,
+        currency="EUR",
+        price_value=price_value,
+        unit_count=None,
+        weight_kg=None,
+        posted_at=None,
+    )
+
+def _walk_json_for_lots(root: Any, out: list[dict[str, Any]]):
+    """Collect dicts that look like lot records (iterative, bounded by WALK_MAX_NODES/WALK_MAX_DEPTH)."""
+    taken: set[int] = set()
+    stack: list[tuple[Any, int]] = [(root, 0)]
+    visited = 0
+    while stack and visited < WALK_MAX_NODES:
+        node, depth = stack.pop()
+        visited += 1
+        if isinstance(node, dict):
+            lots = node.get("lots")
+            if isinstance(lots, list):
+                for it in lots:
+                    if isinstance(it, dict) and id(it) not in taken:
+                        taken.add(id(it))
+                        out.append(it)
+            # generic heuristic: dict with id + (title|name) + (image|thumbnail)
+            if (
+                id(node) not in taken
+                and ("id" in node or "uuid" in node or "lotId" in node)
+                and ("title" in node or "name" in node or "lotTitle" in node)
+                and any(k in node for k in ("image", "imageUrl", "thumbnailUrl", "mainImageUrl", "thumbnail"))
+            ):
+                taken.add(id(node))
+                out.append(node)
+            children = node.values()
+        elif isinstance(node, list):
+            children = node
+        else:
+            continue
+        if depth < WALK_MAX_DEPTH:
+            # reversed keeps document order when popping from the stack
+            stack.extend((v, depth + 1) for v in reversed(list(children)) if isinstance(v, (dict, list)))
 
 def _deep_get(d: dict, path: str):
     cur: Any = d
@@ -319,7 +447,7 @@ def _parse_price(text: str | None) -> float:
     if not text:
         return 0.0
     cleaned = str(text).replace("\xa0", " ").replace(".", "").replace(",", ".")
-    m = re.search(r"€\s*([0-9]+(?:\.[0-9]+)?)", cleaned)
+    m = PRICE_RE.search(cleaned)
     try:
         return float(m.group(1)) if m else 0.0
     except Exception:
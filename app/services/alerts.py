@@ -1,13 +1,21 @@
 # app/services/alerts.py
+import asyncio
+import logging
 from datetime import datetime, timedelta, timezone
 from sqlalchemy import select
-from telegram import Bot, InputMediaPhoto
-from telegram.constants import ParseMode
-from app.db import SessionLocal
-from app.models import Listing, User, Watch, UserSeen
-from app.scoring import final_rank_score
+from telegram import Bot
+from app.config import settings
+from app.db import ReadSessionLocal
+from app.models import Listing, User, Watch
+from app.scoring import final_rank_score, as_utc
+from app.services.delivery import Card, send_cards
+from app.services.digest_state import digest_state
+from app.services.matcher import WatchMatcher
+from app.services.seen import seen_store
 import humanize
 
+logger = logging.getLogger(__name__)
+
 def _format_listing(l: Listing) -> str:
     parts = [
         f"*{l.title[:100]}*",
@@ -26,60 +34,87 @@ def _format_listing(l: Listing) -> str:
     if l.distance_km:
         parts.append(f"Distance: ~{int(l.distance_km)} km")
     if l.created_at:
-        parts.append(f"{humanize.naturaltime(datetime.now(timezone.utc)-l.created_at)}")
+        parts.append(f"{humanize.naturaltime(datetime.now(timezone.utc) - as_utc(l.created_at))}")
     return "\n".join(parts)
 
 async def send_hourly_digest(bot: Bot):
-    async with SessionLocal() as s:
+    """
+    Incremental: only listings written since the last run (Listing.updated_at
+    past the high-water mark) are matched, and merged into each user's backlog
+    of matched-but-unsent lots. Users whose watches changed, and everyone on the
+    first run after a restart, get one full scan of the 24h window instead.
+    Digests go to all users at once through the delivery queue, without a DB
+    session open; what was sent is recorded in one bulk write.
+    """
+    started = datetime.now(timezone.utc)
+    since = started - timedelta(hours=24)
+    delta_since = digest_state.delta_since(settings.DIGEST_HWM_OVERLAP_S)
+    async with ReadSessionLocal() as s:
         users = (await s.execute(select(User))).scalars().all()
-        since = datetime.now(timezone.utc) - timedelta(hours=24)
-        recent_listings = (await s.execute(select(Listing).where(Listing.created_at >= since))).scalars().all()
+        watches = (await s.execute(select(Watch.id, Watch.user_id, Watch.keyword))).all()
+        watches_by_user: dict[int, set] = {}
+        for w in watches:
+            watches_by_user.setdefault(w.user_id, set()).add((w.id, w.keyword))
+        rescan = digest_state.users_to_rescan({u: frozenset(ws) for u, ws in watches_by_user.items()})
+        changed = []
+        if delta_since is not None:
+            changed = (await s.execute(
+                select(Listing).where(Listing.updated_at > delta_since, Listing.created_at >= since)
+            )).scalars().all()
+        window = []
+        if rescan:
+            window = (await s.execute(select(Listing).where(Listing.created_at >= since))).scalars().all()
 
-        for u in users:
-            watches = (await s.execute(select(Watch).where(Watch.user_id == u.tg_user_id))).scalars().all()
-            if not watches:
-                continue
+    gate = [k for k in settings.DIGEST_GATE_KEYWORDS.split(",") if k.strip()]
+    digest_state.expire(since)
+    digest_state.forget_listings(l.id for l in changed)
+    for user_id in rescan:
+        digest_state.reset_user(user_id)
+    # one pass per listing for all watches of the users being matched
+    for listings, user_ids in ((changed, watches_by_user.keys() - rescan), (window, rescan)):
+        if not listings or not user_ids:
+            continue
+        owner = {wid: u for u in user_ids for wid, _ in watches_by_user[u]}
+        matcher = WatchMatcher((w for u in user_ids for w in watches_by_user[u]), gate=gate)
+        for l in listings:
+            for user_id in {owner[w] for w in matcher.match(l.title)}:
+                digest_state.hold(user_id, l)
+    digest_state.advance(changed or window, floor=started)
 
-            candidates: list[Listing] = []
-            for l in recent_listings:
-                if l.distance_km and l.distance_km > (u.radius_km or 500):
-                    continue
-                if not any(k in (l.title or "").lower() for k in ("sneaker","shoe","trainer","adidas","nike")):
-                    continue
-                for w in watches:
-                    if any(kw in (l.title or "").lower() for kw in w.keyword.lower().split()):
-                        candidates.append(l)
-                        break
+    candidates_by_user: dict[int, list[Listing]] = {}
+    for u in users:
+        candidates = [
+            l for l in digest_state.pending(u.tg_user_id)
+            if not (l.distance_km and l.distance_km > (u.radius_km or 500))
+        ]
+        if candidates:
+            candidates_by_user[u.tg_user_id] = candidates
+    if not candidates_by_user:
+        return
 
-            uniq = {l.id: l for l in candidates}.values()
-            ranked = sorted(uniq, key=lambda x: final_rank_score(x.flip_score, x.created_at), reverse=True)[:10]
-            if not ranked:
-                continue
+    await seen_store.load(candidates_by_user)
+    try:
+        batches: dict[int, list[Listing]] = {}
+        for user_id, candidates in candidates_by_user.items():
+            digest_state.drop(user_id, [l.id for l in candidates if seen_store.has(user_id, l.id)])
+            fresh = [l for l in candidates if not seen_store.has(user_id, l.id)]
+            ranked = sorted(fresh, key=lambda x: final_rank_score(x.flip_score, x.created_at), reverse=True)[:10]
+            if ranked:
+                batches[user_id] = ranked
 
-            seen_ids = set((await s.execute(select(UserSeen.listing_id).where(UserSeen.user_id == u.tg_user_id))).scalars().all())
-            ranked = [l for l in ranked if l.id not in seen_ids]
-            if not ranked:
+        # all users at once; the delivery queue does the pacing
+        results = await asyncio.gather(*(_send_digest(bot, u, ranked) for u, ranked in batches.items()), return_exceptions=True)
+        sent: dict[int, list[int]] = {}
+        for (user_id, ranked), err in zip(batches.items(), results):
+            if err is not None:
+                logger.warning("digest to %s failed", user_id, exc_info=err)
                 continue
+            sent[user_id] = [l.id for l in ranked]
+            digest_state.drop(user_id, sent[user_id])
 
-            media, captions = [], []
-            for l in ranked[:10]:
-                caption = _format_listing(l)
-                if l.photo_url:
-                    media.append(InputMediaPhoto(media=l.photo_url, caption=caption, parse_mode=ParseMode.MARKDOWN))
-                else:
-                    captions.append(caption)
-
-            chat_id = u.tg_user_id
-            if media:
-                try:
-                    await bot.send_media_group(chat_id=chat_id, media=media)
-                except Exception:
-                    for m in media:
-                        await bot.send_photo(chat_id=chat_id, photo=m.media, caption=m.caption, parse_mode=ParseMode.MARKDOWN)
-
-            for cap in captions:
-                await bot.send_message(chat_id=chat_id, text=cap, parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=False)
+        await seen_store.add(sent)
+    finally:
+        seen_store.release(candidates_by_user)
 
-            for l in ranked:
-                s.add(UserSeen(user_id=u.tg_user_id, listing_id=l.id))
-            await s.commit()
+async def _send_digest(bot: Bot, chat_id: int, ranked: list[Listing]) -> None:
+    await send_cards(bot, chat_id, [Card(_format_listing(l), l.photo_url) for l in ranked])
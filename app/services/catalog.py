@@ -0,0 +1,114 @@
+# app/services/catalog.py
+"""
+Persisted category catalog for both sources. A scheduler job rediscovers both
+category trees from the sites in the background; the /troost and /vavato menus
+and the hourly sweep read from it. When discovery fails the stored rows are
+kept; Troostwijk's static TOP_CATEGORIES only fill an empty table on first start.
+"""
+import asyncio
+import logging
+from sqlalchemy import select, delete, func
+from app.db import SessionLocal, ReadSessionLocal
+from app.models import Category
+from app.scrapers.base import BaseScraper, CrawlTarget
+from app.scrapers.troostwijk import TroostwijkScraper
+from app.scrapers.vavato import VavatoScraper
+
+logger = logging.getLogger(__name__)
+
+def _top_url(s: BaseScraper, slug: str, uuid: str) -> str:
+    return f"{s.base_url}/en/c/{slug}/{uuid}"
+
+async def load_tops(source: str) -> list[Category]:
+    async with ReadSessionLocal() as s:
+        rows = await s.execute(
+            select(Category)
+            .where(Category.source == source, Category.parent_slug == "")
+            .order_by(Category.position)
+        )
+        return list(rows.scalars().all())
+
+async def load_subs(source: str, top_slug: str) -> list[Category]:
+    async with ReadSessionLocal() as s:
+        rows = await s.execute(
+            select(Category)
+            .where(Category.source == source, Category.parent_slug == top_slug)
+            .order_by(Category.position)
+        )
+        return list(rows.scalars().all())
+
+async def seed_catalog() -> None:
+    """First start: put the static Troostwijk top categories in so /troost works before any refresh."""
+    src = TroostwijkScraper.source
+    async with SessionLocal() as s:
+        n = (await s.execute(select(func.count()).select_from(Category).where(Category.source == src))).scalar_one()
+        if n:
+            return
+        scraper = TroostwijkScraper()
+        for i, t in enumerate(TroostwijkScraper.TOP_CATEGORIES):
+            s.add(Category(source=src, slug=t.slug, uuid=t.uuid, name=t.name,
+                           url=_top_url(scraper, t.slug, t.uuid), position=i))
+        await s.commit()
+
+async def _discover(scraper: BaseScraper) -> list[Category] | None:
+    """New catalog rows for one source, or None when discovery failed outright."""
+    tops = await scraper.list_top_categories()
+    if not tops:
+        return None
+    results = await asyncio.gather(*(scraper.list_subcategories(t.slug, t.uuid) for t in tops), return_exceptions=True)
+    previous = {}
+    async with SessionLocal() as s:
+        for c in (await s.execute(select(Category).where(Category.source == scraper.source, Category.parent_slug != ""))).scalars():
+            previous.setdefault(c.parent_slug, []).append(c)
+
+    rows: list[Category] = []
+    for i, (top, subs) in enumerate(zip(tops, results)):
+        rows.append(Category(
+            source=scraper.source, slug=top.slug, uuid=top.uuid, name=top.name,
+            url=_top_url(scraper, top.slug, top.uuid), lot_count=getattr(top, "lot_count", None), position=i,
+        ))
+        if isinstance(subs, BaseException):
+            # keep what we knew for this top instead of dropping its submenu
+            logger.warning("[catalog:%s] subcategories of %s failed: %r", scraper.source, top.slug, subs)
+            rows.extend(
+                Category(source=c.source, parent_slug=c.parent_slug, slug=c.slug, uuid=c.uuid, name=c.name,
+                         url=c.url, lot_count=c.lot_count, position=c.position)
+                for c in previous.get(top.slug, [])
+            )
+            continue
+        for j, sc in enumerate(subs):
+            rows.append(Category(
+                source=scraper.source, parent_slug=sc.top_slug, slug=sc.sub_slug, uuid=sc.uuid, name=sc.name,
+                url=sc.url.split("?")[0], lot_count=sc.lot_count, position=j,
+            ))
+    return rows
+
+async def refresh_catalog() -> None:
+    """Rediscover both category trees and swap each source's rows in one transaction."""
+    for scraper in (TroostwijkScraper(), VavatoScraper()):
+        try:
+            rows = await _discover(scraper)
+        except Exception:
+            logger.exception("[catalog:%s] refresh failed", scraper.source)
+            continue
+        if not rows:
+            logger.warning("[catalog:%s] nothing discovered, keeping the current catalog", scraper.source)
+            continue
+        async with SessionLocal() as s:
+            await s.execute(delete(Category).where(Category.source == scraper.source))
+            s.add_all(rows)
+            await s.commit()
+        logger.info("[catalog:%s] %d categories", scraper.source, len(rows))
+
+async def catalog_targets(scraper: BaseScraper) -> list[CrawlTarget]:
+    """Sweep targets from the catalog: every subcategory, plus tops that have none."""
+    async with ReadSessionLocal() as s:
+        cats = (await s.execute(select(Category).where(Category.source == scraper.source))).scalars().all()
+    with_subs = {c.parent_slug for c in cats if c.parent_slug}
+    targets = []
+    for c in cats:
+        if c.parent_slug:
+            targets.append(CrawlTarget(category=f"{c.parent_slug}/{c.slug}", url=c.url + scraper.listing_query))
+        elif c.slug not in with_subs:
+            targets.append(CrawlTarget(category=c.slug, url=c.url + scraper.listing_query))
+    return targets
@@ -0,0 +1,34 @@
+# app/services/cursors.py
+from datetime import datetime, timezone
+from sqlalchemy import select, delete
+from app.db import SessionLocal
+from app.models import CrawlCursor
+
+async def load_cursor(source: str, category: str) -> int:
+    async with SessionLocal() as s:
+        page = (
+            await s.execute(
+                select(CrawlCursor.next_page).where(CrawlCursor.source == source, CrawlCursor.category == category)
+            )
+        ).scalar_one_or_none()
+    return page or 1
+
+async def save_cursor(source: str, category: str, next_page: int) -> None:
+    async with SessionLocal() as s:
+        cur = (
+            await s.execute(
+                select(CrawlCursor).where(CrawlCursor.source == source, CrawlCursor.category == category)
+            )
+        ).scalar_one_or_none()
+        if cur is None:
+            s.add(CrawlCursor(source=source, category=category, next_page=next_page))
+        else:
+            cur.next_page = next_page
+            cur.updated_at = datetime.now(timezone.utc)
+        await s.commit()
+
+async def clear_cursor(source: str, category: str) -> None:
+    """The category was walked to the end (or to known lots): start from page 1 next time."""
+    async with SessionLocal() as s:
+        await s.execute(delete(CrawlCursor).where(CrawlCursor.source == source, CrawlCursor.category == category))
+        await s.commit()
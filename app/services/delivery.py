@@ -0,0 +1,339 @@
+# app/services/delivery.py
+"""
+Outgoing Telegram traffic goes through one queue served by DELIVERY_WORKERS
+concurrent workers. Sends are paced to DELIVERY_RATE_PER_S bot-wide and one
+call per DELIVERY_CHAT_INTERVAL_S per chat. Calls to the same chat keep their
+order, with interactive replies ahead of digest traffic. On RetryAfter the
+whole queue pauses for the requested time and the call is retried.
+"""
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from functools import partial
+from typing import Any, Awaitable, Callable, Optional
+from telegram import Bot, InputMediaPhoto
+from telegram.constants import ParseMode
+from telegram.error import BadRequest, RetryAfter
+from app.config import settings
+from app.scrapers.throttle import PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, WaitStats
+from app.services.photo_cache import (
+    claim_uploads, load_file_ids, file_id_for, forget_file_id, is_failing, mark_failed, release_uploads, store_file_ids,
+)
+
+logger = logging.getLogger(__name__)
+
+_READY, _DELAYED, _IN_FLIGHT = "ready", "delayed", "in_flight"
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    chat_id: int = field(compare=False)
+    call: Callable[[], Awaitable[Any]] = field(compare=False)
+    cost: int = field(compare=False)
+    enqueued: float = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    attempts: int = field(compare=False, default=0)
+
+
+class DeliveryQueue:
+    def __init__(self, rate_per_s: float, chat_interval_s: float, workers: int, max_retries: int):
+        self.rate_per_s = rate_per_s
+        self.chat_interval_s = chat_interval_s
+        self.max_retries = max_retries
+        self._n_workers = workers
+        self._workers: list[asyncio.Task] = []
+        self._seq = itertools.count()
+        self._chats: dict[int, list[_Job]] = {}       # chat -> heap of queued calls
+        self._state: dict[int, str] = {}              # chat -> ready / delayed / in_flight
+        self._next_at: dict[int, float] = {}          # chat -> earliest monotonic time of its next call
+        self._ready: list[tuple[int, int, int]] = []  # (priority, seq, chat) of the chat's head call
+        self._delayed: list[tuple[float, int]] = []   # (not before, chat)
+        self._wake = asyncio.Event()
+        self._tokens = float(rate_per_s)
+        self._last = time.monotonic()
+        self._bucket_lock = asyncio.Lock()
+        self._paused_until = 0.0
+        self.sent = self.failed = self.retried = 0
+        self.stats: dict[int, WaitStats] = {}
+
+    def _ensure_workers(self) -> None:
+        self._workers = [t for t in self._workers if not t.done()]
+        while len(self._workers) < self._n_workers:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    def submit(self, chat_id: int, call: Callable[[], Awaitable[Any]],
+               priority: int = PRIORITY_BACKGROUND, cost: int = 1) -> asyncio.Future:
+        """Queue a zero-argument coroutine function; the future resolves to its result."""
+        self._ensure_workers()
+        job = _Job(priority, next(self._seq), chat_id, call, cost, time.monotonic(),
+                   asyncio.get_running_loop().create_future())
+        heapq.heappush(self._chats.setdefault(chat_id, []), job)
+        state = self._state.get(chat_id)
+        if state is None:
+            self._schedule(chat_id)
+        elif state == _READY and self._chats[chat_id][0] is job:
+            # jumped ahead of this chat's queued calls: let the chat jump ahead too
+            heapq.heappush(self._ready, (job.priority, job.seq, chat_id))
+        return job.future
+
+    async def send(self, chat_id: int, call: Callable[[], Awaitable[Any]],
+                   priority: int = PRIORITY_BACKGROUND, cost: int = 1) -> Any:
+        return await self.submit(chat_id, call, priority, cost)
+
+    def _schedule(self, chat_id: int) -> None:
+        jobs = self._chats.get(chat_id)
+        if not jobs:
+            self._chats.pop(chat_id, None)
+            self._state.pop(chat_id, None)
+            return
+        now = time.monotonic()
+        not_before = self._next_at.get(chat_id, 0.0)
+        if not_before > now:
+            self._state[chat_id] = _DELAYED
+            heapq.heappush(self._delayed, (not_before, chat_id))
+        else:
+            self._state[chat_id] = _READY
+            heapq.heappush(self._ready, (jobs[0].priority, jobs[0].seq, chat_id))
+        self._wake.set()
+
+    async def _next_job(self) -> _Job:
+        while True:
+            now = time.monotonic()
+            while self._delayed and self._delayed[0][0] <= now:
+                _, chat_id = heapq.heappop(self._delayed)
+                if self._state.get(chat_id) == _DELAYED:
+                    self._schedule(chat_id)
+            while self._ready:
+                _, _, chat_id = heapq.heappop(self._ready)
+                if self._state.get(chat_id) == _READY and self._chats.get(chat_id):
+                    self._state[chat_id] = _IN_FLIGHT
+                    return heapq.heappop(self._chats[chat_id])
+            timeout = self._delayed[0][0] - now if self._delayed else None
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _take_tokens(self, cost: int) -> None:
+        async with self._bucket_lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.rate_per_s, self._tokens + (now - self._last) * self.rate_per_s)
+                self._last = now
+                need = min(cost, self.rate_per_s)
+                if self._tokens >= need:
+                    self._tokens -= need
+                    return
+                await asyncio.sleep((need - self._tokens) / self.rate_per_s)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._next_job()
+            try:
+                await self._run(job)
+            finally:
+                self._next_at[job.chat_id] = time.monotonic() + self.chat_interval_s
+                self._state.pop(job.chat_id, None)
+                self._schedule(job.chat_id)
+                if len(self._next_at) > 10_000:
+                    now = time.monotonic()
+                    self._next_at = {c: t for c, t in self._next_at.items() if t > now}
+
+    async def _run(self, job: _Job) -> None:
+        if job.future.done():  # caller gave up
+            return
+        await self._take_tokens(job.cost)
+        try:
+            result = await job.call()
+        except RetryAfter as e:
+            wait = e.retry_after.total_seconds() if isinstance(e.retry_after, timedelta) else float(e.retry_after)
+            self._paused_until = max(self._paused_until, time.monotonic() + wait)
+            self.retried += 1
+            job.attempts += 1
+            logger.warning("telegram flood control: pausing delivery for %.0fs", wait)
+            if job.attempts <= self.max_retries:
+                heapq.heappush(self._chats[job.chat_id], job)  # same seq: stays first in its chat
+                return
+            self._finish(job, exc=e)
+        except Exception as e:
+            self._finish(job, exc=e)
+        else:
+            self._finish(job, result=result)
+
+    def _finish(self, job: _Job, result: Any = None, exc: Optional[BaseException] = None) -> None:
+        if exc is None:
+            self.sent += 1
+            self.stats.setdefault(job.priority, WaitStats()).add(time.monotonic() - job.enqueued)
+        else:
+            self.failed += 1
+        if not job.future.done():
+            if exc is None:
+                job.future.set_result(result)
+            else:
+                job.future.set_exception(exc)
+
+    async def close(self) -> None:
+        for t in self._workers:
+            t.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def snapshot(self) -> dict:
+        queued = {PRIORITY_INTERACTIVE: 0, PRIORITY_BACKGROUND: 0}
+        for jobs in self._chats.values():
+            for j in jobs:
+                queued[j.priority] = queued.get(j.priority, 0) + 1
+        return {
+            "queued_interactive": queued[PRIORITY_INTERACTIVE],
+            "queued_background": queued[PRIORITY_BACKGROUND],
+            "in_flight": sum(1 for s in self._state.values() if s == _IN_FLIGHT),
+            "chats_waiting": len(self._chats),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "paused_s": round(max(0.0, self._paused_until - time.monotonic()), 1),
+            # wait_s here is enqueue -> delivered
+            "interactive": self.stats.get(PRIORITY_INTERACTIVE, WaitStats()).as_dict(),
+            "background": self.stats.get(PRIORITY_BACKGROUND, WaitStats()).as_dict(),
+        }
+
+
+@dataclass
+class Card:
+    caption: str
+    photo_url: Optional[str] = None
+
+
+# BadRequest messages (lowercased) that are about the photo itself, not the chat or the caption
+_URL_ERRORS = (
+    "failed to get http url content", "wrong type of the web page content", "wrong file identifier/http url",
+    "invalid file http url", "image_process_failed", "photo_invalid_dimensions",
+)
+_FILE_ID_ERRORS = ("wrong file identifier", "wrong remote file identifier", "wrong padding")
+
+
+def _is_url_error(e: BadRequest) -> bool:
+    return any(k in e.message.lower() for k in _URL_ERRORS)
+
+
+def _is_file_id_error(e: BadRequest) -> bool:
+    return any(k in e.message.lower() for k in _FILE_ID_ERRORS)
+
+
+# Telegram's limit for one text message
+_MAX_TEXT = 4096
+
+
+def _text_batches(captions: list[str]) -> list[str]:
+    """Text-only cards joined into as few messages as fit, each card whole."""
+    out: list[str] = []
+    for c in captions:
+        if out and len(out[-1]) + 2 + len(c) <= _MAX_TEXT:
+            out[-1] += "\n\n" + c
+        else:
+            out.append(c)
+    return out
+
+
+def _photo_file_id(message) -> Optional[str]:
+    return message.photo[-1].file_id if getattr(message, "photo", None) else None
+
+
+async def _send_photo(bot: Bot, chat_id: int, card: Card, priority: int):
+    """By file_id when we have one; a file_id Telegram no longer accepts is dropped and the URL used instead."""
+    def send(photo: str) -> asyncio.Future:
+        return delivery.submit(chat_id, partial(bot.send_photo, chat_id=chat_id, photo=photo, caption=card.caption,
+                                                parse_mode=ParseMode.MARKDOWN), priority)
+    file_id = file_id_for(card.photo_url)
+    if file_id is None:
+        return await send(card.photo_url)
+    try:
+        return await send(file_id)
+    except BadRequest as e:
+        if not _is_file_id_error(e):
+            raise
+        logger.info("stale file_id for %s: %s", card.photo_url, e.message)
+    await forget_file_id(card.photo_url)
+    return await send(card.photo_url)
+
+
+async def _send_photos(bot: Bot, chat_id: int, cards: list[Card], priority: int) -> tuple[list[Card], list[Exception]]:
+    """Sends the photo cards; returns the cards left to send as text and the errors to raise."""
+    photos = [c for c in cards if c.photo_url and not is_failing(c.photo_url)]
+    texts = [c for c in cards if not c.photo_url or is_failing(c.photo_url)]
+    uploaded: dict[str, str] = {}
+    if len(photos) > 1:
+        media = [
+            InputMediaPhoto(media=file_id_for(c.photo_url) or c.photo_url, caption=c.caption, parse_mode=ParseMode.MARKDOWN)
+            for c in photos
+        ]
+        try:
+            messages = await delivery.send(chat_id, partial(bot.send_media_group, chat_id=chat_id, media=media), priority, cost=len(media))
+        except BadRequest as e:
+            if not (_is_url_error(e) or _is_file_id_error(e)):
+                raise  # caption or chat problem: sending the photos one by one would fail the same way
+            logger.debug("album to %s failed, sending photos one by one: %s", chat_id, e.message)
+        except Exception:
+            logger.debug("album to %s failed, sending photos one by one", chat_id, exc_info=True)
+        else:
+            uploaded.update((c.photo_url, _photo_file_id(m)) for c, m in zip(photos, messages))
+            photos = []
+
+    errors = []
+    results = await asyncio.gather(*(_send_photo(bot, chat_id, c, priority) for c in photos), return_exceptions=True)
+    for c, r in zip(photos, results):
+        if isinstance(r, BadRequest) and _is_url_error(r):
+            mark_failed(c.photo_url)
+            texts.append(c)
+        elif isinstance(r, Exception):
+            errors.append(r)
+        else:
+            uploaded[c.photo_url] = _photo_file_id(r)
+    await store_file_ids(uploaded)
+    return texts, errors
+
+
+async def send_cards(bot: Bot, chat_id: int, cards: list[Card], priority: int = PRIORITY_BACKGROUND) -> None:
+    """
+    Photo cards as one album, then the text-only cards in as few messages as fit.
+    Photos Telegram already has go
+    by file_id. If the album is rejected each photo is sent on its own, and one
+    Telegram cannot fetch goes out as a text card instead. Errors about the chat
+    or the caption are raised as they are, without marking any photo. Sends of a
+    photo some other send is uploading wait for it and then go by its file_id.
+    """
+    urls = [c.photo_url for c in cards if c.photo_url]
+    await load_file_ids(urls)
+    claimed = await claim_uploads(urls)
+    try:
+        texts, errors = await _send_photos(bot, chat_id, cards, priority)
+    finally:
+        release_uploads(claimed)
+
+    results = await asyncio.gather(*(
+        delivery.submit(chat_id, partial(bot.send_message, chat_id=chat_id, text=text, parse_mode=ParseMode.MARKDOWN,
+                                         disable_web_page_preview=False), priority)
+        for text in _text_batches([c.caption for c in texts])
+    ), return_exceptions=True)
+    errors += [r for r in results if isinstance(r, Exception)]
+    if errors:
+        raise errors[0]
+
+
+delivery = DeliveryQueue(
+    rate_per_s=settings.DELIVERY_RATE_PER_S,
+    chat_interval_s=settings.DELIVERY_CHAT_INTERVAL_S,
+    workers=settings.DELIVERY_WORKERS,
+    max_retries=settings.DELIVERY_MAX_RETRIES,
+)
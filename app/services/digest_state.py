@@ -0,0 +1,84 @@
+# app/services/digest_state.py
+"""
+State carried between hourly digests so each run only evaluates what changed:
+a high-water mark on Listing.updated_at, every user's matched-but-unsent lots
+from earlier runs, and a signature of each user's watches. A user whose watches
+changed (or who is new, or every user after a restart) gets one full rescan of
+the 24h window; everyone else only sees listings updated since the mark.
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from app.models import Listing
+from app.scoring import as_utc
+
+class DigestState:
+    def __init__(self):
+        self.hwm: Optional[datetime] = None
+        self._watch_sig: dict[int, frozenset] = {}
+        self._pending: dict[int, dict[int, Listing]] = {}  # user -> listing id -> listing
+        self._holders: dict[int, set[int]] = {}            # listing id -> users holding it
+
+    def delta_since(self, overlap_s: float) -> Optional[datetime]:
+        """Lower bound for the next delta query; the overlap absorbs ingest commits that raced the last run."""
+        return None if self.hwm is None else self.hwm - timedelta(seconds=overlap_s)
+
+    def advance(self, listings: Iterable[Listing], floor: datetime) -> None:
+        """Move the mark to the newest updated_at read; floor covers a run that read nothing."""
+        if self.hwm is None:
+            self.hwm = floor
+        for l in listings:
+            if l.updated_at is not None:
+                ts = as_utc(l.updated_at)
+                if self.hwm is None or ts > self.hwm:
+                    self.hwm = ts
+
+    def users_to_rescan(self, watches_by_user: dict[int, frozenset]) -> set[int]:
+        """Users whose watch set differs from the last run; users without watches are forgotten."""
+        for user_id in set(self._watch_sig) - set(watches_by_user):
+            self.reset_user(user_id)
+            del self._watch_sig[user_id]
+        changed = {u for u, sig in watches_by_user.items() if self._watch_sig.get(u) != sig}
+        self._watch_sig.update((u, watches_by_user[u]) for u in changed)
+        return changed
+
+    def reset_user(self, user_id: int) -> None:
+        for listing_id in self._pending.pop(user_id, {}):
+            self._release(listing_id, user_id)
+
+    def _release(self, listing_id: int, user_id: int) -> None:
+        holders = self._holders.get(listing_id)
+        if holders is not None:
+            holders.discard(user_id)
+            if not holders:
+                del self._holders[listing_id]
+
+    def forget_listings(self, listing_ids: Iterable[int]) -> None:
+        """Changed listings are re-matched from scratch: drop them from every backlog first."""
+        for listing_id in listing_ids:
+            for user_id in self._holders.pop(listing_id, ()):
+                self._pending.get(user_id, {}).pop(listing_id, None)
+
+    def hold(self, user_id: int, listing: Listing) -> None:
+        self._pending.setdefault(user_id, {})[listing.id] = listing
+        self._holders.setdefault(listing.id, set()).add(user_id)
+
+    def drop(self, user_id: int, listing_ids: Iterable[int]) -> None:
+        pending = self._pending.get(user_id, {})
+        for listing_id in listing_ids:
+            if pending.pop(listing_id, None) is not None:
+                self._release(listing_id, user_id)
+
+    def expire(self, since: datetime) -> None:
+        for user_id, pending in self._pending.items():
+            old = [i for i, l in pending.items() if as_utc(l.created_at) < since]
+            for listing_id in old:
+                del pending[listing_id]
+                self._release(listing_id, user_id)
+
+    def pending(self, user_id: int) -> list[Listing]:
+        return list(self._pending.get(user_id, {}).values())
+
+    def users(self) -> list[int]:
+        return [u for u, p in self._pending.items() if p]
+
+digest_state = DigestState()
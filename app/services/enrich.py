@@ -0,0 +1,110 @@
+# app/services/enrich.py
+"""
+Detail-page enrichment for crawled lots: location, coordinates, weight, units,
+opening/closing time. Place names without coordinates are geocoded offline.
+Detail pages are fetched concurrently (ENRICH_CONCURRENCY) and only for lots
+whose title or photo changed since the last time we saw them; otherwise the
+previous detail is reused from memory or the DB. Bid changes keep the detail:
+the card's price is always the one written. Lots whose detail page had none of
+these fields are remembered too (Listing.detail_key), so they are not fetched
+again either.
+"""
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import fields
+from sqlalchemy import select
+from app.config import settings
+from app.db import ReadSessionLocal
+from app.models import Listing
+from app.schemas import RawListing
+from app.scrapers.base import BaseScraper
+from app.scrapers.detail import LotDetail
+from app.services.geocode import geocode_many
+
+logger = logging.getLogger(__name__)
+
+DETAIL_FIELDS = tuple(f.name for f in fields(LotDetail))
+
+# process-wide cap on concurrent detail fetches, shared by all categories of a sweep
+_detail_slots = asyncio.Semaphore(settings.ENRICH_CONCURRENCY)
+
+# (source, external_id) -> (card key, detail)
+_cache: "OrderedDict[tuple[str, str], tuple[str, LotDetail]]" = OrderedDict()
+
+def _card_key(title: str, photo_url: str | None) -> str:
+    card = f"{title.strip()}\x00{photo_url or ''}"
+    return hashlib.blake2b(card.encode("utf-8"), digest_size=16).hexdigest()
+
+def _remember(key: tuple[str, str], card: str, detail: LotDetail) -> None:
+    _cache[key] = (card, detail)
+    _cache.move_to_end(key)
+    while len(_cache) > settings.ENRICH_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+async def _from_db(source: str, raws: list[RawListing]) -> dict[str, tuple[str, LotDetail]]:
+    """Card key + stored detail of lots already enriched, empty detail included, for lots not in the memory cache."""
+    ids = [r.external_id for r in raws]
+    if not ids:
+        return {}
+    async with ReadSessionLocal() as s:
+        rows = (
+            await s.execute(
+                select(Listing.external_id, Listing.detail_key, Listing.title, Listing.photo_url,
+                       *(getattr(Listing, f) for f in DETAIL_FIELDS))
+                .where(Listing.source == source, Listing.external_id.in_(ids))
+            )
+        ).all()
+    out = {}
+    for row in rows:
+        ext, card, title, photo, *vals = row
+        if card is None and any(v is not None for v in vals):
+            card = _card_key(title, photo)  # enriched before detail_key was stored
+        if card is not None:
+            out[ext] = (card, LotDetail(**dict(zip(DETAIL_FIELDS, vals))))
+    return out
+
+async def enrich_listings(scraper: BaseScraper, raws: list[RawListing]) -> list[RawListing]:
+    if not settings.ENRICH_ENABLED or not raws:
+        return raws
+
+    known: dict[str, tuple[str, LotDetail]] = {}
+    missing = []
+    for r in raws:
+        hit = _cache.get((r.source, r.external_id))
+        if hit is not None:
+            known[r.external_id] = hit
+        else:
+            missing.append(r)
+    known.update(await _from_db(scraper.source, missing))
+
+    async def one(r: RawListing) -> RawListing:
+        card = _card_key(r.title, r.photo_url)
+        hit = known.get(r.external_id)
+        if hit is not None and hit[0] == card:
+            detail = hit[1]
+        else:
+            try:
+                async with _detail_slots:
+                    detail = await scraper.fetch_lot_detail(r.url)
+            except Exception as e:
+                logger.debug("[enrich:%s] %s failed: %r", r.source, r.url, e)
+                return r
+        _remember((r.source, r.external_id), card, detail)
+        return r.model_copy(update={**detail.as_update(), "detail_key": card})
+
+    out = list(await asyncio.gather(*(one(r) for r in raws)))
+    return await _geocode(out)
+
+async def _geocode(raws: list[RawListing]) -> list[RawListing]:
+    """Fill coordinates for lots whose detail page gave a place name but no lat/lon."""
+    names = {r.location_name for r in raws if r.location_name and r.lat is None}
+    if not names:
+        return raws
+    coords = await geocode_many(names)
+    out = []
+    for r in raws:
+        hit = coords.get(r.location_name) if r.lat is None else None
+        out.append(r.model_copy(update={"lat": hit[0], "lon": hit[1]}) if hit else r)
+    return out
@@ -0,0 +1,105 @@
+# app/services/geocode.py
+"""
+Location name -> (lat, lon) without the network: an in-memory LRU, then the
+persisted geocode_cache table, then the offline gazetteer (GEONAMES_PATH),
+loaded lazily in a worker thread on first miss. Gazetteer hits are written back
+to geocode_cache, so a restart resolves known places without reloading the file.
+"""
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from typing import Iterable, Optional
+from sqlalchemy import select
+from app.config import settings
+from app.db import SessionLocal, ReadSessionLocal
+from app.models import GeocodeCache
+from app.utils.gazetteer import Gazetteer
+from app.utils.text import fold
+
+logger = logging.getLogger(__name__)
+
+Coords = Optional[tuple[float, float]]
+
+_lru: "OrderedDict[str, Coords]" = OrderedDict()
+_gazetteer: Optional[Gazetteer] = None
+_load_lock = asyncio.Lock()
+
+
+def _remember(key: str, coords: Coords) -> None:
+    _lru[key] = coords
+    _lru.move_to_end(key)
+    while len(_lru) > settings.GEOCODE_CACHE_SIZE:
+        _lru.popitem(last=False)
+
+
+async def _get_gazetteer() -> Gazetteer:
+    global _gazetteer
+    if _gazetteer is not None:
+        return _gazetteer
+    async with _load_lock:
+        if _gazetteer is None:
+            path = settings.GEONAMES_PATH
+            if path and os.path.exists(path):
+                countries = frozenset(c.strip().upper() for c in settings.GEONAMES_COUNTRIES.split(",") if c.strip())
+                _gazetteer = await asyncio.to_thread(
+                    Gazetteer.load, path, countries, settings.GEONAMES_MIN_POPULATION
+                )
+            else:
+                logger.warning("GEONAMES_PATH %r not found; only cached places will resolve", path)
+                _gazetteer = Gazetteer()
+    return _gazetteer
+
+
+async def geocode_many(names: Iterable[str]) -> dict[str, Coords]:
+    """Resolve distinct location names; unresolvable ones map to None."""
+    out: dict[str, Coords] = {}
+    pending: dict[str, list[str]] = {}  # folded key -> spellings in this batch
+    for name in names:
+        if name in out:
+            continue
+        out[name] = None
+        key = fold(name)
+        if not key:
+            continue
+        if key in _lru:
+            _lru.move_to_end(key)
+            out[name] = _lru[key]
+        else:
+            pending.setdefault(key, []).append(name)
+    if not pending:
+        return out
+
+    async with ReadSessionLocal() as s:
+        rows = (
+            await s.execute(
+                select(GeocodeCache.query, GeocodeCache.lat, GeocodeCache.lon)
+                .where(GeocodeCache.query.in_(list(pending)))
+            )
+        ).all()
+    for key, lat, lon in rows:
+        _remember(key, (lat, lon))
+        for name in pending.pop(key):
+            out[name] = (lat, lon)
+    if not pending:
+        return out
+
+    gz = await _get_gazetteer()
+    found = []
+    for key, spellings in pending.items():
+        coords = gz.resolve(spellings[0])
+        _remember(key, coords)  # misses too, until they fall out of the LRU
+        if coords is not None:
+            found.append(GeocodeCache(query=key, lat=coords[0], lon=coords[1]))
+            for name in spellings:
+                out[name] = coords
+    if found:
+        async with SessionLocal() as s:
+            for row in found:
+                await s.merge(row)  # a concurrent batch may have stored the same place
+            await s.commit()
+    return out
+
+
+async def geocode(name: str) -> Coords:
+    return (await geocode_many([name])).get(name)
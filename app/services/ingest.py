@@ -1,25 +1,159 @@
 # app/services/ingest.py
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta, timezone
 from typing import List
-from sqlalchemy import select
+from sqlalchemy import select, update, tuple_
+from app.config import settings
 from app.schemas import RawListing
-from app.models import Listing
-from app.db import SessionLocal
-from app.normalizer import normalize_and_snapshot
+from app.models import Listing, ListingRaw
+from app.db import SessionLocal, dialect_insert
+from app.normalizer import normalize_and_snapshot, content_hash
+from app.scrapers.detail import LotDetail
+from app.services.raw_store import raw_row
+from app.services.leaderboard import leaderboard
+from app.scoring import as_utc
 
-async def upsert_listings(raws: List[RawListing], base_lat: float, base_lon: float) -> int:
-    count = 0
+# left alone when an existing row is updated
+KEEP_ON_CONFLICT = frozenset({"id", "source", "external_id", "created_at"})
+# only known from detail pages (app/services/enrich.py); lots scraped without them,
+# e.g. from the bot's browse flows, keep the stored values
+DETAIL_COLUMNS = tuple(f.name for f in fields(LotDetail)) + ("detail_key",)
+
+@dataclass
+class UpsertResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    def __iadd__(self, other: "UpsertResult") -> "UpsertResult":
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        return self
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+async def upsert_listings(raws: List[RawListing], base_lat: float, base_lon: float) -> UpsertResult:
+    """
+    Write new and changed listings. Detail columns the scraped lot lacks are taken
+    from the stored row first, and a stored lot keeps its first category. A listing whose content hash matches the stored
+    one is neither normalized nor rewritten; only its last_seen_at is bumped, and
+    at most once per LAST_SEEN_RESOLUTION_S. Written rows get updated_at, which
+    the digest uses as its high-water mark. Written rows are offered to the /top
+    leaderboard after the commit. On the bulk path the counts come from the
+    write's RETURNING: a row another upsert wrote with the same content in the
+    meantime counts as unchanged, not inserted twice. The ORM fallback counts
+    from its own read and is exact only without concurrent writers.
+    """
+    # one row per key: Postgres refuses to update the same row twice in one statement
+    latest = {(r.source, r.external_id): r for r in raws}
+    items = list(latest.items())
+    insert = dialect_insert() if settings.INGEST_BULK else None
+
+    result = UpsertResult()
+    if not items:
+        return result
+    written: list[tuple] = []
     async with SessionLocal() as s:
-        for raw in raws:
-            snap = normalize_and_snapshot(raw, base_lat, base_lon)
-            q = select(Listing).where(Listing.source == snap["source"], Listing.external_id == snap["external_id"])
-            res = await s.execute(q)
-            existing = res.scalar_one_or_none()
-            if existing:
-                for k, v in snap.items():
-                    setattr(existing, k, v)
-                count += 1
-            else:
-                s.add(Listing(**snap))
-                count += 1
+        for i in range(0, len(items), settings.INGEST_CHUNK_SIZE):
+            chunk = items[i:i + settings.INGEST_CHUNK_SIZE]
+            result += await _upsert_chunk(s, insert, chunk, base_lat, base_lon, written)
         await s.commit()
-    return count
+    for key, category, flip_score, created_at in written:
+        leaderboard.offer(key, category, flip_score, created_at)
+    return result
+
+async def _upsert_chunk(s, insert, items: list, base_lat: float, base_lon: float, written: list) -> UpsertResult:
+    now = datetime.now(timezone.utc)
+    stale_before = now - timedelta(seconds=settings.LAST_SEEN_RESOLUTION_S)
+    keys = [k for k, _ in items]
+    stored = {
+        (src, ext): (h, seen, created, category, dict(zip(DETAIL_COLUMNS, detail)))
+        for src, ext, h, seen, created, category, *detail in (
+            await s.execute(
+                select(Listing.source, Listing.external_id, Listing.content_hash, Listing.last_seen_at, Listing.created_at,
+                       Listing.category, *(getattr(Listing, c) for c in DETAIL_COLUMNS))
+                .where(tuple_(Listing.source, Listing.external_id).in_(keys))
+            )
+        ).all()
+    }
+
+    result = UpsertResult()
+    rows, payloads, touch = [], [], []
+    for key, raw in items:
+        prev = stored.get(key)
+        if prev is not None:
+            raw = _keep_stored(raw, prev[3], prev[4])
+        h = content_hash(raw, base_lat, base_lon)
+        if prev is not None and prev[0] == h:
+            result.unchanged += 1
+            if prev[1] is None or as_utc(prev[1]) < stale_before:
+                touch.append(key)
+            continue
+        snap = normalize_and_snapshot(raw, base_lat, base_lon)
+        # created_at is never updated on conflict: a returned row created `now` was inserted by this write
+        snap.update(content_hash=h, last_seen_at=now, updated_at=now, created_at=now)
+        rows.append(snap)
+        payloads.append(raw_row(raw, now))
+        if insert is None:
+            written.append((key, snap["category"], snap["flip_score"], prev[2] if prev is not None else now))
+            if prev is None:
+                result.inserted += 1
+            else:
+                result.updated += 1
+
+    table = Listing.__table__
+    if touch:
+        await s.execute(
+            update(table)
+            .where(tuple_(table.c.source, table.c.external_id).in_(touch))
+            .values(last_seen_at=now)
+        )
+    if rows and insert is not None:
+        stmt = _upsert_stmt(insert, table, rows, changed_only=True).returning(
+            table.c.source, table.c.external_id, table.c.category, table.c.flip_score, table.c.created_at
+        )
+        for src, ext, category, flip_score, created_at in (await s.execute(stmt)).all():
+            created_at = as_utc(created_at)
+            if created_at == now:
+                result.inserted += 1
+            else:
+                result.updated += 1
+            written.append(((src, ext), category, flip_score, created_at))
+        result.unchanged += len(rows) - result.inserted - result.updated
+        await s.execute(_upsert_stmt(insert, ListingRaw.__table__, payloads))
+    elif rows:
+        await _write_orm(s, rows, payloads)
+    return result
+
+def _keep_stored(raw: RawListing, category: str | None, detail: dict) -> RawListing:
+    keep = {
+        k: as_utc(v) if isinstance(v, datetime) else v
+        for k, v in detail.items() if v is not None and getattr(raw, k) is None
+    }
+    if category is not None and raw.category != category:
+        keep["category"] = category
+    return raw.model_copy(update=keep) if keep else raw
+
+def _upsert_stmt(insert, table, rows: list[dict], changed_only: bool = False):
+    stmt = insert(table).values(rows)
+    updates = {c.name: stmt.excluded[c.name] for c in table.columns if c.name not in KEEP_ON_CONFLICT}
+    # changed_only: a row that already holds this content (written by a concurrent upsert) is skipped
+    where = table.c.content_hash.is_distinct_from(stmt.excluded.content_hash) if changed_only else None
+    return stmt.on_conflict_do_update(index_elements=["source", "external_id"], set_=updates, where=where)
+
+async def _write_orm(s, rows: list[dict], payloads: list[dict]) -> None:
+    """Row-by-row fallback for other databases (or INGEST_BULK=false)."""
+    for snap in rows:
+        q = select(Listing).where(Listing.source == snap["source"], Listing.external_id == snap["external_id"])
+        existing = (await s.execute(q)).scalar_one_or_none()
+        if existing is None:
+            s.add(Listing(**snap))
+        else:
+            for k, v in snap.items():
+                if k not in KEEP_ON_CONFLICT:
+                    setattr(existing, k, v)
+    for p in payloads:
+        await s.merge(ListingRaw(**p))
@@ -0,0 +1,133 @@
+# app/services/leaderboard.py
+"""
+In-memory leaderboard for /top: lots created in the last LEADERBOARD_WINDOW_H
+hours, ranked by final_rank_score (flip score x recency tier), overall and per
+category. Each board keeps one list per recency tier sorted by flip score, so
+the top N is a merge of the tier heads; lots move down a tier as they age.
+Ingest feeds it incrementally; warm_leaderboard() loads it at startup.
+"""
+import bisect
+import heapq
+import itertools
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import select
+from app.config import settings
+from app.db import ReadSessionLocal
+from app.models import Listing
+from app.scoring import RECENCY_TIERS, as_utc
+
+Key = tuple[str, str]  # (source, external_id)
+
+def board_names(category: Optional[str]) -> tuple[str, ...]:
+    """Overall board, the full category path and its top-level slug."""
+    if not category:
+        return ("",)
+    cat = category.lower()
+    return tuple(dict.fromkeys(("", cat, cat.split("/", 1)[0])))
+
+@dataclass
+class _Entry:
+    score: float
+    created_at: datetime
+    boards: tuple[str, ...]
+    tier: int
+
+class Leaderboard:
+    def __init__(self, window_h: float):
+        self.window = timedelta(hours=window_h)
+        # (tier end as age, boost), cut to the window; the last tier ends at the window
+        self.tiers: list[tuple[timedelta, float]] = []
+        for max_age_h, boost in RECENCY_TIERS:
+            self.tiers.append((min(timedelta(hours=max_age_h), self.window), boost))
+            if max_age_h >= window_h:
+                break
+        else:
+            self.tiers.append((self.window, 1.0))
+        self._entries: dict[Key, _Entry] = {}
+        # board name -> per tier: sorted [(-flip_score, key)]
+        self._boards: dict[str, list[list[tuple[float, Key]]]] = {}
+        self._expiry: list[tuple[datetime, int, Key, int]] = []  # (leaves tier at, seq, key, tier)
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _tier_for(self, age: timedelta) -> Optional[int]:
+        for i, (end, _) in enumerate(self.tiers):
+            if age < end:
+                return i
+        return None
+
+    def _place(self, key: Key, e: _Entry) -> None:
+        item = (-e.score, key)
+        for name in e.boards:
+            tiers = self._boards.setdefault(name, [[] for _ in self.tiers])
+            bisect.insort(tiers[e.tier], item)
+        heapq.heappush(self._expiry, (e.created_at + self.tiers[e.tier][0], next(self._seq), key, e.tier))
+
+    def _unplace(self, key: Key, e: _Entry) -> None:
+        item = (-e.score, key)
+        for name in e.boards:
+            lst = self._boards[name][e.tier]
+            i = bisect.bisect_left(lst, item)
+            if i < len(lst) and lst[i] == item:
+                del lst[i]
+
+    def _advance(self, now: datetime) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            _, _, key, tier = heapq.heappop(self._expiry)
+            e = self._entries.get(key)
+            if e is None or e.tier != tier:
+                continue  # superseded by a later offer()
+            self._unplace(key, e)
+            nxt = self._tier_for(now - e.created_at)
+            if nxt is None:
+                del self._entries[key]
+            else:
+                e.tier = nxt
+                self._place(key, e)
+
+    def offer(self, key: Key, category: Optional[str], flip_score: Optional[float], created_at: datetime) -> None:
+        """Insert or re-score a lot."""
+        now = datetime.now(timezone.utc)
+        created_at = as_utc(created_at)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._unplace(key, old)
+        tier = self._tier_for(now - created_at)
+        if tier is None:
+            return
+        e = _Entry(score=flip_score or 0.0, created_at=created_at, boards=board_names(category), tier=tier)
+        self._entries[key] = e
+        self._place(key, e)
+
+    def top(self, n: int, category: Optional[str] = None) -> list[tuple[Key, float]]:
+        self._advance(datetime.now(timezone.utc))
+        tiers = self._boards.get(category.lower() if category else "")
+        if not tiers:
+            return []
+        streams = [_boosted(lst, boost) for lst, (_, boost) in zip(tiers, self.tiers)]
+        return [(key, -neg) for neg, key in itertools.islice(heapq.merge(*streams), n)]
+
+    def categories(self) -> list[str]:
+        return sorted(name for name, tiers in self._boards.items() if name and any(tiers))
+
+def _boosted(tier: list[tuple[float, Key]], boost: float):
+    for neg, key in tier:
+        yield neg * boost, key
+
+leaderboard = Leaderboard(settings.LEADERBOARD_WINDOW_H)
+
+async def warm_leaderboard() -> None:
+    since = datetime.now(timezone.utc) - leaderboard.window
+    async with ReadSessionLocal() as s:
+        rows = (
+            await s.execute(
+                select(Listing.source, Listing.external_id, Listing.category, Listing.flip_score, Listing.created_at)
+                .where(Listing.created_at >= since)
+            )
+        ).all()
+    for source, external_id, category, flip_score, created_at in rows:
+        leaderboard.offer((source, external_id), category, flip_score, created_at)
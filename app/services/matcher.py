@@ -0,0 +1,88 @@
+# app/services/matcher.py
+"""
+Watch matching for the digest. Every keyword of every watch goes into one
+Aho-Corasick automaton over folded text (lowercase, no accents, punctuation as
+spaces), so each listing title is scanned once, whatever the number of watches.
+Semantics match the old per-user loop: a watch matches when any of its
+keywords occurs in the title.
+"""
+from __future__ import annotations
+from collections import deque
+from typing import Iterable
+from app.utils.text import fold
+
+
+class AhoCorasick:
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[int, ...]] = [()]
+        self.patterns: list[str] = []
+        for p in patterns:
+            self._add(p)
+        self._link()
+
+    def _add(self, pattern: str) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        self._out[node] += (len(self.patterns),)
+        self.patterns.append(pattern)
+
+    def _link(self) -> None:
+        """Breadth-first failure links; outputs inherit those of their failure node."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[child] = self._goto[f].get(ch, 0)
+                self._out[child] += self._out[self._fail[child]]
+
+    def find(self, text: str) -> set[int]:
+        """Ids (indexes into .patterns) of all patterns occurring in text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: set[int] = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+class WatchMatcher:
+    """Built once per digest from (watch_id, keyword string) pairs plus the category gate."""
+
+    def __init__(self, watches: Iterable[tuple[int, str]], gate: Iterable[str] = ()):
+        self._watches_by_word: dict[str, set[int]] = {}
+        for watch_id, keyword in watches:
+            for word in (keyword or "").split():
+                w = fold(word)
+                if w:
+                    self._watches_by_word.setdefault(w, set()).add(watch_id)
+        self._gate = {g for g in (fold(x) for x in gate) if g}
+        words = list(self._watches_by_word)
+        self._ac = AhoCorasick(words + sorted(self._gate - self._watches_by_word.keys()))
+
+    def match(self, title: str) -> set[int]:
+        """Watch ids matching the title; empty when the title fails the gate."""
+        hits = {self._ac.patterns[i] for i in self._ac.find(fold(title or ""))}
+        if self._gate and not (hits & self._gate):
+            return set()
+        watch_ids: set[int] = set()
+        for word in hits:
+            watch_ids |= self._watches_by_word.get(word, set())
+        return watch_ids
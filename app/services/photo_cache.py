@@ -0,0 +1,138 @@
+# app/services/photo_cache.py
+"""
+Photo URL -> Telegram file_id. The first successful send of a listing photo
+stores the file_id Telegram returns (in memory and in photo_file_ids). Later
+sends, to any user, pass the file_id, so Telegram does not fetch the image from
+the auction CDN again. While one send is uploading a URL, other sends of the
+same URL wait for its file_id instead of uploading it too. URLs Telegram could
+not fetch are remembered for PHOTO_FAIL_TTL_S, and their cards go out as text in
+the meantime.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+from sqlalchemy import select, delete
+from app.config import settings
+from app.db import SessionLocal, ReadSessionLocal, dialect_insert
+from app.models import PhotoFileId
+
+logger = logging.getLogger(__name__)
+
+_lru: "OrderedDict[str, str]" = OrderedDict()  # photo url -> file_id
+_failed: dict[str, float] = {}                 # photo url -> monotonic time it stops counting as failed
+_uploads: dict[str, asyncio.Event] = {}        # photo url -> set when the send uploading it is done
+
+
+def url_hash(url: str) -> str:
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _remember(url: str, file_id: str) -> None:
+    _lru[url] = file_id
+    _lru.move_to_end(url)
+    while len(_lru) > settings.PHOTO_CACHE_SIZE:
+        _lru.popitem(last=False)
+
+
+async def load_file_ids(urls: Iterable[str]) -> None:
+    """Pull the stored file_ids of URLs not in memory yet; one query."""
+    missing = {url_hash(u): u for u in set(urls) if u and u not in _lru}
+    if not missing:
+        return
+    async with ReadSessionLocal() as s:
+        rows = (
+            await s.execute(
+                select(PhotoFileId.url_hash, PhotoFileId.file_id).where(PhotoFileId.url_hash.in_(list(missing)))
+            )
+        ).all()
+    for h, file_id in rows:
+        _remember(missing[h], file_id)
+
+
+def file_id_for(url: str) -> Optional[str]:
+    file_id = _lru.get(url)
+    if file_id is not None:
+        _lru.move_to_end(url)
+    return file_id
+
+
+def is_failing(url: str) -> bool:
+    until = _failed.get(url)
+    if until is None:
+        return False
+    if until < time.monotonic():
+        del _failed[url]
+        return False
+    return True
+
+
+def mark_failed(url: str) -> None:
+    _failed[url] = time.monotonic() + settings.PHOTO_FAIL_TTL_S
+    _lru.pop(url, None)
+    if len(_failed) > settings.PHOTO_CACHE_SIZE:
+        now = time.monotonic()
+        for u in [u for u, t in _failed.items() if t < now]:
+            del _failed[u]
+
+
+async def claim_uploads(urls: Iterable[str]) -> list[str]:
+    """
+    Single-flight uploads. Waits while other sends are uploading any of these URLs
+    (their file_id is usually known afterwards), then claims the ones still
+    without a file_id for the caller, who must release_uploads() them when done.
+    """
+    urls = [u for u in dict.fromkeys(urls) if u]
+    while True:
+        busy = [_uploads[u] for u in urls if u in _uploads and file_id_for(u) is None]
+        if not busy:
+            break
+        await asyncio.gather(*(ev.wait() for ev in busy))
+    claimed = [u for u in urls if file_id_for(u) is None and not is_failing(u)]
+    for u in claimed:
+        _uploads[u] = asyncio.Event()
+    return claimed
+
+
+def release_uploads(urls: Iterable[str]) -> None:
+    for u in urls:
+        ev = _uploads.pop(u, None)
+        if ev is not None:
+            ev.set()
+
+
+async def forget_file_id(url: str) -> None:
+    """Telegram rejected the stored file_id: drop it here and in the DB, or load_file_ids brings it back."""
+    _lru.pop(url, None)
+    async with SessionLocal() as s:
+        await s.execute(delete(PhotoFileId).where(PhotoFileId.url_hash == url_hash(url)))
+        await s.commit()
+
+
+async def store_file_ids(pairs: dict[str, str]) -> None:
+    """Record url -> file_id for photos just uploaded; ones already known are skipped."""
+    new = {u: f for u, f in pairs.items() if u and f and _lru.get(u) != f}
+    if not new:
+        return
+    for u, f in new.items():
+        _remember(u, f)
+    rows = [{"url_hash": url_hash(u), "photo_url": u, "file_id": f} for u, f in new.items()]
+    async with SessionLocal() as s:
+        insert = dialect_insert()
+        if insert is None:
+            for r in rows:
+                await s.merge(PhotoFileId(**r))
+        else:
+            stmt = insert(PhotoFileId).values(rows)
+            await s.execute(stmt.on_conflict_do_update(index_elements=["url_hash"], set_={"file_id": stmt.excluded.file_id}))
+        await s.commit()
+
+
+async def expire_file_ids(before) -> int:
+    """Drop file_ids recorded before the retention cutoff; returns rows deleted."""
+    async with SessionLocal() as s:
+        res = await s.execute(delete(PhotoFileId).where(PhotoFileId.created_at < before))
+        await s.commit()
+    return res.rowcount or 0
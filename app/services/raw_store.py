@@ -0,0 +1,43 @@
+# app/services/raw_store.py
+"""
+Cold storage for scraped RawListing payloads (table listing_raw), zlib-compressed
+unless RAW_COMPRESS is off. Nothing on the digest / bot path reads them; they are
+kept for debugging parsers and for re-normalizing without a re-scrape.
+"""
+import json
+import zlib
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select
+from app.config import settings
+from app.db import ReadSessionLocal
+from app.models import ListingRaw
+from app.schemas import RawListing
+
+CODEC_ZLIB = "zlib"
+CODEC_JSON = "json"
+
+def pack(data: dict) -> tuple[bytes, str]:
+    blob = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if settings.RAW_COMPRESS:
+        return zlib.compress(blob, 6), CODEC_ZLIB
+    return blob, CODEC_JSON
+
+def unpack(blob: bytes, codec: str) -> dict:
+    if codec == CODEC_ZLIB:
+        blob = zlib.decompress(blob)
+    return json.loads(blob.decode("utf-8"))
+
+def raw_row(raw: RawListing, now: datetime) -> dict:
+    data, codec = pack(raw.model_dump(mode="json"))
+    return dict(source=raw.source, external_id=raw.external_id, codec=codec, data=data, updated_at=now)
+
+async def load_raw(source: str, external_id: str) -> Optional[dict]:
+    async with ReadSessionLocal() as s:
+        row = (
+            await s.execute(
+                select(ListingRaw.data, ListingRaw.codec)
+                .where(ListingRaw.source == source, ListingRaw.external_id == external_id)
+            )
+        ).one_or_none()
+    return None if row is None else unpack(row.data, row.codec)
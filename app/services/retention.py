@@ -0,0 +1,132 @@
+# app/services/retention.py
+"""
+Daily retention: listings not seen for RETENTION_DAYS are written to
+ARCHIVE_DIR/listings/dt=<created date>/part-*.jsonl.zst (gzip when zstandard is
+not installed), then deleted together with their listing_raw payload. Per-user
+seen-state buckets and photo file_ids past the same window expire. Ends with an
+incremental vacuum + ANALYZE.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import select, delete, func, tuple_
+from app.config import settings
+from app.db import SessionLocal, engine, IS_SQLITE
+from app.models import Listing, ListingRaw
+from app.services.raw_store import unpack
+from app.services.photo_cache import expire_file_ids
+from app.services.seen import expire_seen_state
+
+try:
+    import zstandard as _zstd
+except ImportError:
+    _zstd = None
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class RetentionReport:
+    archived: int = 0
+    seen_buckets_expired: int = 0
+    photo_ids_expired: int = 0
+    files: int = 0
+    duration_s: float = 0.0
+
+def _json_default(v):
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    raise TypeError(type(v).__name__)
+
+def _write_part(directory: str, name: str, records: list[dict]) -> str:
+    os.makedirs(directory, exist_ok=True)
+    payload = "".join(json.dumps(r, default=_json_default, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+    if _zstd is not None:
+        path, blob = os.path.join(directory, name + ".jsonl.zst"), _zstd.ZstdCompressor(level=10).compress(payload)
+    else:
+        path, blob = os.path.join(directory, name + ".jsonl.gz"), gzip.compress(payload)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)  # rows are deleted only after this returns
+    return path
+
+def _archive_batch(run_id: str, batch_no: int, records: list[dict]) -> int:
+    by_day: dict[str, list[dict]] = {}
+    for r in records:
+        created = r.get("created_at")
+        day = created.date().isoformat() if isinstance(created, datetime) else "unknown"
+        by_day.setdefault(day, []).append(r)
+    for day, recs in by_day.items():
+        _write_part(os.path.join(settings.ARCHIVE_DIR, "listings", f"dt={day}"), f"part-{run_id}-{batch_no:04d}", recs)
+    return len(by_day)
+
+async def _archive_and_delete(cutoff: datetime, report: RetentionReport) -> None:
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    cols = Listing.__table__.columns
+    last_seen = func.coalesce(Listing.last_seen_at, Listing.created_at)
+    batch_no = 0
+    while True:
+        async with SessionLocal() as s:
+            rows = (
+                await s.execute(
+                    select(*cols).where(last_seen < cutoff).order_by(Listing.id).limit(settings.RETENTION_BATCH)
+                )
+            ).mappings().all()
+            if not rows:
+                return
+            keys = [(r["source"], r["external_id"]) for r in rows]
+            raws = {
+                (src, ext): unpack(data, codec)
+                for src, ext, data, codec in (
+                    await s.execute(
+                        select(ListingRaw.source, ListingRaw.external_id, ListingRaw.data, ListingRaw.codec)
+                        .where(tuple_(ListingRaw.source, ListingRaw.external_id).in_(keys))
+                    )
+                ).all()
+            }
+            records = [{**r, "raw": raws.get((r["source"], r["external_id"]))} for r in rows]
+            report.files += await asyncio.to_thread(_archive_batch, run_id, batch_no, records)
+
+            await s.execute(delete(ListingRaw).where(tuple_(ListingRaw.source, ListingRaw.external_id).in_(keys)))
+            await s.execute(delete(Listing).where(Listing.id.in_([r["id"] for r in rows])))
+            await s.commit()
+        report.archived += len(rows)
+        batch_no += 1
+
+async def _compact() -> None:
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        if IS_SQLITE:
+            mode = (await conn.exec_driver_sql("PRAGMA auto_vacuum")).scalar()
+            if mode != 2:
+                # auto_vacuum=INCREMENTAL only takes effect after one full VACUUM
+                await conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+                await conn.exec_driver_sql("VACUUM")
+            else:
+                await conn.exec_driver_sql(f"PRAGMA incremental_vacuum({settings.RETENTION_VACUUM_PAGES})")
+            await conn.exec_driver_sql("ANALYZE")
+            await conn.exec_driver_sql("PRAGMA optimize")
+        elif engine.dialect.name == "postgresql":
+            await conn.exec_driver_sql("VACUUM (ANALYZE) listings, listing_raw, user_seen_state")
+
+async def run_retention() -> RetentionReport:
+    report = RetentionReport()
+    t0 = time.monotonic()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.RETENTION_DAYS)
+    try:
+        await _archive_and_delete(cutoff, report)
+        report.seen_buckets_expired = await expire_seen_state()
+        report.photo_ids_expired = await expire_file_ids(cutoff)
+        await _compact()
+    except Exception:
+        logger.exception("retention failed")
+    report.duration_s = round(time.monotonic() - t0, 2)
+    logger.info("retention: %s", report)
+    return report
@@ -0,0 +1,130 @@
+# app/services/search.py
+"""
+Full-text search over listing titles and categories.
+SQLite: an FTS5 external-content table (listings_fts) kept in sync by triggers.
+Postgres: a generated tsvector column with a GIN index.
+Both are maintained by the database itself, so every ingest / retention write
+updates the index with no extra code on those paths.
+
+Query syntax for /search: bare words must all match, "quoted words" match as a
+phrase, and a trailing * matches a prefix (adi* -> adidas).
+"""
+import re
+from dataclasses import dataclass
+from sqlalchemy import text, select
+from app.db import ReadSessionLocal, engine
+from app.models import Listing
+
+_TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS listings_fts USING fts5(
+        title, category, content='listings', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2')""",
+    """CREATE TRIGGER IF NOT EXISTS listings_fts_ai AFTER INSERT ON listings BEGIN
+        INSERT INTO listings_fts(rowid, title, category) VALUES (new.id, new.title, new.category);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS listings_fts_ad AFTER DELETE ON listings BEGIN
+        INSERT INTO listings_fts(listings_fts, rowid, title, category) VALUES ('delete', old.id, old.title, old.category);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS listings_fts_au AFTER UPDATE OF title, category ON listings BEGIN
+        INSERT INTO listings_fts(listings_fts, rowid, title, category) VALUES ('delete', old.id, old.title, old.category);
+        INSERT INTO listings_fts(rowid, title, category) VALUES (new.id, new.title, new.category);
+    END""",
+]
+
+POSTGRES_DDL = [
+    """ALTER TABLE listings ADD COLUMN IF NOT EXISTS search_tsv tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(category, ''))) STORED""",
+    "CREATE INDEX IF NOT EXISTS idx_listings_search ON listings USING gin (search_tsv)",
+]
+
+def ensure_search_index(sync_conn) -> None:
+    """Called from init_db; idempotent. A new FTS5 table is backfilled from existing rows."""
+    dialect = sync_conn.dialect.name
+    if dialect == "sqlite":
+        existed = sync_conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'listings_fts'")
+        ).first()
+        for ddl in SQLITE_DDL:
+            sync_conn.execute(text(ddl))
+        if not existed:
+            sync_conn.execute(text("INSERT INTO listings_fts(listings_fts) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        for ddl in POSTGRES_DDL:
+            sync_conn.execute(text(ddl))
+
+@dataclass
+class Term:
+    words: list[str]
+    prefix: bool = False
+
+def parse_query(q: str) -> list[Term]:
+    terms = []
+    for m in _TOKEN_RE.finditer(q):
+        phrase, bare = m.group(1), m.group(2)
+        if phrase is not None:
+            words = _WORD_RE.findall(phrase.lower())
+            if words:
+                terms.append(Term(words))
+        else:
+            words = _WORD_RE.findall(bare.lower())
+            if not words:
+                continue
+            # "nike-air" is a phrase of its parts; a trailing * applies to the last part
+            terms.append(Term(words, prefix=bare.endswith("*")))
+    return terms
+
+def to_fts5(terms: list[Term]) -> str:
+    parts = []
+    for t in terms:
+        expr = '"' + " ".join(t.words) + '"'
+        parts.append(expr + "*" if t.prefix else expr)
+    return " AND ".join(parts)
+
+def to_tsquery(terms: list[Term]) -> str:
+    parts = []
+    for t in terms:
+        words = list(t.words)
+        if t.prefix:
+            words[-1] += ":*"
+        parts.append(words[0] if len(words) == 1 else "(" + " <-> ".join(words) + ")")
+    return " & ".join(parts)
+
+async def search_listings(q: str, limit: int = 10) -> list[Listing]:
+    """Best matches first; empty when the query has no searchable words."""
+    terms = parse_query(q)
+    if not terms:
+        return []
+    dialect = engine.dialect.name
+    async with ReadSessionLocal() as s:
+        if dialect == "sqlite":
+            ids = (
+                await s.execute(
+                    text(
+                        "SELECT rowid FROM listings_fts WHERE listings_fts MATCH :q "
+                        "ORDER BY bm25(listings_fts, 10.0, 2.0) LIMIT :n"
+                    ),
+                    {"q": to_fts5(terms), "n": limit},
+                )
+            ).scalars().all()
+        elif dialect == "postgresql":
+            ids = (
+                await s.execute(
+                    text(
+                        "SELECT id FROM listings WHERE search_tsv @@ to_tsquery('simple', :q) "
+                        "ORDER BY ts_rank_cd(search_tsv, to_tsquery('simple', :q)) DESC LIMIT :n"
+                    ),
+                    {"q": to_tsquery(terms), "n": limit},
+                )
+            ).scalars().all()
+        else:
+            stmt = select(Listing.id)
+            for t in terms:
+                stmt = stmt.where(Listing.title.ilike(f"%{' '.join(t.words)}%"))
+            ids = (await s.execute(stmt.order_by(Listing.created_at.desc()).limit(limit))).scalars().all()
+        if not ids:
+            return []
+        by_id = {l.id: l for l in (await s.execute(select(Listing).where(Listing.id.in_(ids)))).scalars()}
+    return [by_id[i] for i in ids if i in by_id]
@@ -0,0 +1,144 @@
+# app/services/seen.py
+"""
+What each user has already been sent, as one compact id set per (user, UTC day)
+in user_seen_state. Only days inside RETENTION_DAYS count; older buckets are
+ignored on load and deleted by the retention job, so a user's state stays
+bounded no matter how long they have been subscribed. Loaded lazily, only for
+the users a digest is about to message, and kept in a bounded LRU.
+"""
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Iterable
+from sqlalchemy import select, delete, func
+from app.config import settings
+from app.db import SessionLocal, ReadSessionLocal, dialect_insert
+from app.models import UserSeen, UserSeenState
+from app.utils.idset import encode_ids, decode_ids
+
+logger = logging.getLogger(__name__)
+
+def day_bucket(dt: datetime | None = None) -> int:
+    """Days since the epoch (UTC)."""
+    dt = dt or datetime.now(timezone.utc)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() // 86400)
+
+def oldest_bucket() -> int:
+    return day_bucket() - settings.RETENTION_DAYS
+
+class SeenStore:
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        # user_id -> {day bucket: listing ids}
+        self._users: "OrderedDict[int, dict[int, set[int]]]" = OrderedDict()
+        self._pinned: set[int] = set()  # loaded for a digest in progress: never evicted
+
+    def _remember(self, user_id: int, buckets: dict[int, set[int]]) -> None:
+        self._users[user_id] = buckets
+        self._users.move_to_end(user_id)
+        self._trim()
+
+    def _trim(self) -> None:
+        while len(self._users) > self.max_users:
+            victim = next((u for u in self._users if u not in self._pinned), None)
+            if victim is None:
+                return  # everyone left is pinned; the cache shrinks back on release()
+            del self._users[victim]
+
+    async def load(self, user_ids: Iterable[int]) -> None:
+        """
+        Make sure the given users are in memory, with one query for all that are
+        missing, and pin them until release(): a digest to more users than
+        max_users must not evict the ones it just loaded.
+        """
+        user_ids = list(user_ids)
+        self._pinned.update(user_ids)
+        missing = [u for u in user_ids if u not in self._users]
+        for u in user_ids:
+            if u in self._users:
+                self._users.move_to_end(u)
+        if not missing:
+            return
+        loaded: dict[int, dict[int, set[int]]] = {u: {} for u in missing}
+        async with ReadSessionLocal() as s:
+            for i in range(0, len(missing), 1000):
+                rows = await s.execute(
+                    select(UserSeenState.user_id, UserSeenState.bucket, UserSeenState.ids)
+                    .where(UserSeenState.user_id.in_(missing[i:i + 1000]), UserSeenState.bucket >= oldest_bucket())
+                )
+                for user_id, bucket, blob in rows.all():
+                    loaded[user_id][bucket] = set(decode_ids(blob))
+        for user_id, buckets in loaded.items():
+            self._remember(user_id, buckets)
+
+    def release(self, user_ids: Iterable[int]) -> None:
+        self._pinned.difference_update(user_ids)
+        self._trim()
+
+    def has(self, user_id: int, listing_id: int) -> bool:
+        oldest = oldest_bucket()
+        buckets = self._users.get(user_id, {})
+        return any(listing_id in ids for b, ids in buckets.items() if b >= oldest)
+
+    async def add(self, sent: dict[int, list[int]]) -> None:
+        """Record deliveries into today's bucket, merged with what is stored."""
+        if not sent:
+            return
+        # today's row is rewritten whole, so it must never be written from a user that is not loaded
+        unpinned = [u for u in sent if u not in self._pinned]
+        await self.load(sent)
+        try:
+            today, oldest = day_bucket(), oldest_bucket()
+            rows = []
+            for user_id, listing_ids in sent.items():
+                buckets = self._users[user_id]
+                for b in [b for b in buckets if b < oldest]:
+                    del buckets[b]
+                ids = buckets.setdefault(today, set())
+                ids.update(listing_ids)
+                rows.append({"user_id": user_id, "bucket": today, "ids": encode_ids(ids)})
+            async with SessionLocal() as s:
+                await _write_buckets(s, rows)
+                await s.commit()
+        finally:
+            self.release(unpinned)
+
+async def _write_buckets(s, rows: list[dict]) -> None:
+    insert = dialect_insert()
+    if insert is None:
+        for r in rows:
+            await s.merge(UserSeenState(**r))
+        return
+    for i in range(0, len(rows), 1000):
+        stmt = insert(UserSeenState).values(rows[i:i + 1000])
+        await s.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id", "bucket"], set_={"ids": stmt.excluded.ids}
+        ))
+
+async def expire_seen_state() -> int:
+    """Drop buckets older than the retention window; returns rows deleted."""
+    async with SessionLocal() as s:
+        res = await s.execute(delete(UserSeenState).where(UserSeenState.bucket < oldest_bucket()))
+        await s.commit()
+    return res.rowcount or 0
+
+async def migrate_user_seen() -> None:
+    """One-off: fold legacy per-row user_seen records into day buckets, then empty the table."""
+    async with SessionLocal() as s:
+        if not (await s.execute(select(func.count()).select_from(UserSeen))).scalar_one():
+            return
+        oldest = oldest_bucket()
+        buckets: dict[tuple[int, int], set[int]] = {}
+        rows = await s.stream(select(UserSeen.user_id, UserSeen.listing_id, UserSeen.created_at))
+        async for user_id, listing_id, created_at in rows:
+            b = day_bucket(created_at)
+            if b >= oldest:
+                buckets.setdefault((user_id, b), set()).add(listing_id)
+        await _write_buckets(s, [{"user_id": u, "bucket": b, "ids": encode_ids(ids)} for (u, b), ids in buckets.items()])
+        await s.execute(delete(UserSeen))
+        await s.commit()
+    logger.info("migrated user_seen into %d seen-state buckets", len(buckets))
+
+seen_store = SeenStore(settings.SEEN_CACHE_USERS)
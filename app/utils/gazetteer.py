@@ -0,0 +1,131 @@
+# app/utils/gazetteer.py
+"""
+Offline place-name index built from a GeoNames dump (cities1000.txt, an EU
+extract of allCountries.txt, ...). Names, ASCII names and alternate names are
+folded (lowercase, no accents, no punctuation) and mapped to a row in compact
+coordinate arrays; on collisions the most populous place wins.
+"""
+from __future__ import annotations
+import logging
+import re
+from array import array
+from typing import Iterable, Optional
+from app.utils.text import fold
+
+logger = logging.getLogger(__name__)
+
+# GeoNames main table columns we use
+COL_NAME, COL_ASCII, COL_ALT, COL_LAT, COL_LON, COL_CLASS, COL_CC, COL_POP = 1, 2, 3, 4, 5, 6, 8, 14
+
+# Country names as they appear on lot pages (en/nl/fr/de) -> ISO code
+COUNTRY_CODES = {
+    "belgium": "BE", "belgie": "BE", "belgique": "BE", "belgien": "BE",
+    "netherlands": "NL", "the netherlands": "NL", "nederland": "NL", "pays bas": "NL", "niederlande": "NL", "holland": "NL",
+    "germany": "DE", "duitsland": "DE", "allemagne": "DE", "deutschland": "DE",
+    "france": "FR", "frankrijk": "FR", "frankreich": "FR",
+    "luxembourg": "LU", "luxemburg": "LU",
+    "spain": "ES", "spanje": "ES", "espagne": "ES", "spanien": "ES", "espana": "ES",
+    "italy": "IT", "italie": "IT", "italien": "IT", "italia": "IT",
+    "austria": "AT", "oostenrijk": "AT", "autriche": "AT", "osterreich": "AT",
+    "poland": "PL", "polen": "PL", "pologne": "PL", "polska": "PL",
+    "portugal": "PT", "denmark": "DK", "denemarken": "DK", "danemark": "DK", "danmark": "DK",
+    "czech republic": "CZ", "czechia": "CZ", "tsjechie": "CZ", "tchequie": "CZ", "tschechien": "CZ",
+    "sweden": "SE", "zweden": "SE", "suede": "SE", "schweden": "SE",
+    "ireland": "IE", "ierland": "IE", "irlande": "IE", "irland": "IE",
+    "united kingdom": "GB", "uk": "GB", "verenigd koninkrijk": "GB", "royaume uni": "GB",
+    "switzerland": "CH", "zwitserland": "CH", "suisse": "CH", "schweiz": "CH",
+    "hungary": "HU", "hongarije": "HU", "hongrie": "HU", "ungarn": "HU",
+    "romania": "RO", "roemenie": "RO", "roumanie": "RO", "rumanien": "RO",
+    "slovakia": "SK", "slovenia": "SI", "croatia": "HR", "greece": "GR", "bulgaria": "BG",
+    "lithuania": "LT", "latvia": "LV", "estonia": "EE", "finland": "FI",
+}
+
+_POSTCODE_RE = re.compile(r"\b(?:[a-z]{1,2}[- ]?)?\d{3,6}(?:\s?[a-z]{2})?\b")
+
+
+def country_code(part: str) -> Optional[str]:
+    folded = fold(part)
+    if len(folded) == 2 and folded.isalpha():
+        return folded.upper()
+    return COUNTRY_CODES.get(folded)
+
+
+def place_keys(location_name: str) -> list[str]:
+    """
+    Lookup keys for a free-form location, most specific first:
+    '9000 Gent, Belgium' -> ['gent|BE', 'gent'].
+    """
+    parts = [p for p in (s.strip() for s in location_name.split(",")) if p]
+    if not parts:
+        return []
+    cc = country_code(parts[-1]) if len(parts) > 1 else None
+    if cc:
+        parts = parts[:-1]
+    keys = []
+    # the city is usually first, but "street, postcode city" puts it last
+    for part in (parts[0], *reversed(parts[1:])):
+        name = _POSTCODE_RE.sub(" ", fold(part)).strip()
+        name = " ".join(name.split())
+        if not name:
+            continue
+        if cc:
+            keys.append(f"{name}|{cc}")
+        keys.append(name)
+    return list(dict.fromkeys(keys))
+
+
+class Gazetteer:
+    def __init__(self):
+        self._index: dict[str, int] = {}
+        self._lat = array("d")
+        self._lon = array("d")
+        self._pop = array("q")
+
+    def __len__(self) -> int:
+        return len(self._lat)
+
+    def _put(self, key: str, row: int) -> None:
+        cur = self._index.get(key)
+        if cur is None or self._pop[row] > self._pop[cur]:
+            self._index[key] = row
+
+    def add(self, names: Iterable[str], cc: str, lat: float, lon: float, population: int) -> None:
+        row = len(self._lat)
+        self._lat.append(lat)
+        self._lon.append(lon)
+        self._pop.append(population)
+        for name in {fold(n) for n in names if n}:
+            if name:
+                self._put(name, row)
+                self._put(f"{name}|{cc}", row)
+
+    def lookup(self, key: str) -> Optional[tuple[float, float]]:
+        row = self._index.get(key)
+        return None if row is None else (self._lat[row], self._lon[row])
+
+    def resolve(self, location_name: str) -> Optional[tuple[float, float]]:
+        for key in place_keys(location_name):
+            hit = self.lookup(key)
+            if hit is not None:
+                return hit
+        return None
+
+    @classmethod
+    def load(cls, path: str, countries: frozenset[str] = frozenset(), min_population: int = 0) -> "Gazetteer":
+        """Read a GeoNames TSV; only populated places (feature class P) are kept."""
+        gz = cls()
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                cols = line.rstrip("\n").split("\t")
+                if len(cols) <= COL_POP or cols[COL_CLASS] != "P":
+                    continue
+                cc = cols[COL_CC]
+                if countries and cc not in countries:
+                    continue
+                population = int(cols[COL_POP] or 0)
+                if population < min_population:
+                    continue
+                names = [cols[COL_NAME], cols[COL_ASCII], *cols[COL_ALT].split(",")]
+                gz.add(names, cc, float(cols[COL_LAT]), float(cols[COL_LON]), population)
+        logger.info("gazetteer: %d places, %d names from %s", len(gz), len(gz._index), path)
+        return gz
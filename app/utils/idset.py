@@ -0,0 +1,26 @@
+# app/utils/idset.py
+"""Sorted integer sets as delta + LEB128 varint bytes: a few hundred ids fit in well under 1 KB."""
+from typing import Iterable
+
+def encode_ids(ids: Iterable[int]) -> bytes:
+    out = bytearray()
+    prev = 0
+    for n in sorted(set(ids)):
+        delta, prev = n - prev, n
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+def decode_ids(blob: bytes) -> list[int]:
+    ids, cur, shift, prev = [], 0, 0, 0
+    for b in blob:
+        cur |= (b & 0x7F) << shift
+        if b & 0x80:
+            shift += 7
+            continue
+        prev += cur
+        ids.append(prev)
+        cur, shift = 0, 0
+    return ids
@@ -0,0 +1,10 @@
+# app/utils/text.py
+import re
+import unicodedata
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+def fold(s: str) -> str:
+    """Lowercase, strip accents, punctuation runs -> one space: 'Saint-Étienne ' -> 'saint etienne'."""
+    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii").lower()
+    return _NON_WORD_RE.sub(" ", s).strip()
@@ -1,6 +1,8 @@
 # app/web/server.py
 from fastapi import FastAPI
 from telegram import Bot
+from app.scrapers.throttle import governor_stats
+from app.services.delivery import delivery
 
 def create_app(bot: Bot) -> FastAPI:
     app = FastAPI(title="EU Liquidation Radar")
@@ -9,6 +11,10 @@ def create_app(bot: Bot) -> FastAPI:
     async def healthz():
         return {"ok": True}
 
+    @app.get("/stats")
+    async def stats():
+        return {"scrape_hosts": governor_stats(), "telegram_delivery": delivery.snapshot()}
+
     # Placeholder for webhook:
     # @app.post("/telegram/webhook")
     # async def webhook(update: dict):
@@ -1,19 +1,122 @@
 # app/workers.py
-from app.config import settings  # noqa: F401
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, asdict
+from app.config import settings
+from app.scrapers.base import BaseScraper, CrawlTarget
 from app.scrapers.troostwijk import TroostwijkScraper
 from app.scrapers.vavato import VavatoScraper
 from app.services.ingest import upsert_listings
+from app.services.cursors import load_cursor, save_cursor, clear_cursor
+from app.services.catalog import catalog_targets
+from app.services.enrich import enrich_listings
 
-async def run_scrape_cycle():
-    keywords = ["sneaker", "shoes", "nike", "adidas"]
-    scrapers = [TroostwijkScraper(), VavatoScraper()]
-    all_raw = []
-    for s in scrapers:
+logger = logging.getLogger(__name__)
+
+@dataclass
+class SourceReport:
+    source: str
+    targets: int = 0
+    pages_ok: int = 0
+    categories_failed: int = 0
+    categories_cut: int = 0
+    lots: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    duration_s: float = 0.0
+    timed_out: bool = False
+
+async def _walk(s: BaseScraper, t: CrawlTarget, start: int, max_pages: int, report: SourceReport,
+                save: bool = False) -> tuple[int, bool]:
+    """Ingest pages from `start` until one brings no new lot; returns (pages read, stopped at known lots)."""
+    read = 0
+    async for page in s.iter_lots(t, start_page=start, max_pages=max_pages):
+        read += 1
+        report.pages_ok += 1
+        report.lots += len(page.lots)
+        lots = await enrich_listings(s, page.lots)
+        res = await upsert_listings(lots, settings.BASE_LAT, settings.BASE_LON)
+        report.inserted += res.inserted
+        report.updated += res.updated
+        report.unchanged += res.unchanged
+        if res.inserted == 0:
+            return read, True
+        if save:
+            await save_cursor(s.source, t.category, page.number + 1)
+    return read, False
+
+async def _crawl_target(s: BaseScraper, t: CrawlTarget, sem: asyncio.Semaphore, report: SourceReport) -> None:
+    """
+    Walk one category page by page, ingesting each page as it arrives. Stops after
+    the first page whose lots are all already in the DB. The cursor is saved after
+    every page, so a walk cut off by the deadline or CRAWL_MAX_PAGES resumes there
+    next cycle. A resumed walk reads the head of the category (page 1 on, until
+    known lots) first, so new lots are not left waiting behind the deep walk; it
+    continues from the cursor with the pages left.
+    """
+    async with sem:
+        resume = await load_cursor(s.source, t.category)
+        budget = settings.CRAWL_MAX_PAGES
+        if resume > 1:
+            head = min(budget, resume - 1)
+            read, known = await _walk(s, t, 1, head, report)
+            if not known and read < head:
+                await clear_cursor(s.source, t.category)  # the category now ends before the cursor
+                return
+            budget -= read
+            if budget == 0:
+                return
+        read, known = await _walk(s, t, resume, budget, report, save=True)
+        if known or read < budget:
+            await clear_cursor(s.source, t.category)
+
+async def _crawl_source(s: BaseScraper, sem: asyncio.Semaphore, deadline: float) -> SourceReport:
+    loop = asyncio.get_running_loop()
+    report = SourceReport(source=s.source)
+    started = loop.time()
+    try:
         try:
-            items = await s.search(keywords)
-            all_raw.extend(items)
-        except Exception as e:
-            print(f"[scrape:{s.source}] error: {e}")
-    # Base lat/lon currently from global settings (Marseille) via normalizer call
-    from app.config import settings as _s
-    await upsert_listings(all_raw, _s.BASE_LAT, _s.BASE_LON)
+            targets = await catalog_targets(s) or await asyncio.wait_for(
+                s.crawl_targets(), timeout=max(0.0, deadline - loop.time())
+            )
+        except asyncio.TimeoutError:
+            report.timed_out = True
+            return report
+        report.targets = len(targets)
+
+        tasks = {asyncio.create_task(_crawl_target(s, t, sem, report)): t for t in targets}
+        if not tasks:
+            return report
+        done, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - loop.time()))
+        for t in pending:
+            t.cancel()
+        if pending:
+            report.timed_out = True
+            report.categories_cut = len(pending)
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        for t in done:
+            if t.exception() is not None:
+                report.categories_failed += 1
+                logger.warning("[scrape:%s] category %s failed: %r", s.source, tasks[t].url, t.exception())
+    except Exception:
+        logger.exception("[scrape:%s] crawl failed", s.source)
+    finally:
+        report.duration_s = round(loop.time() - started, 2)
+    return report
+
+async def run_scrape_cycle() -> list[SourceReport]:
+    """Sweep every category of every source concurrently, bounded by CRAWL_CONCURRENCY and CRAWL_DEADLINE_S."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.CRAWL_DEADLINE_S
+    sem = asyncio.Semaphore(settings.CRAWL_CONCURRENCY)
+    scrapers: list[BaseScraper] = [TroostwijkScraper(), VavatoScraper()]
+
+    t0 = time.monotonic()
+    reports = await asyncio.gather(*(_crawl_source(s, sem, deadline) for s in scrapers))
+    for r in reports:
+        logger.info("[scrape:%s] %s", r.source, asdict(r))
+    logger.info("scrape cycle finished in %.1fs", time.monotonic() - t0)
+    return list(reports)
@@ -5,8 +5,17 @@ import logging
 import uvicorn
 from app.config import settings
 from app.db import init_db
+from app.services.catalog import seed_catalog
+from app.services.delivery import delivery
+from app.services.leaderboard import warm_leaderboard
+from app.services.seen import migrate_user_seen
 from app.bot.handlers import build_app as build_bot_app
 from app.jobs.scheduler import start_scheduler
+from app.scrapers.http import open_clients, close_clients
+from app.scrapers.parsing import start_parse_pool, shutdown_parse_pool
+from app.scrapers.render import close_render_pool
+from app.scrapers.troostwijk import TroostwijkScraper
+from app.scrapers.vavato import VavatoScraper
 from app.web.server import create_app as create_web_app
 
 logger = logging.getLogger(__name__)
@@ -15,6 +24,13 @@ logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL))
 async def run():
     # 1) DB
     await init_db()
+    await seed_catalog()
+    await migrate_user_seen()
+    await warm_leaderboard()
+
+    # 1b) Shared HTTP pools for scrapers + bot flows
+    open_clients([TroostwijkScraper.base_url, VavatoScraper.base_url])
+    start_parse_pool()
 
     # 2) Telegram bot (PTB 20/21 async pattern)
     application = await build_bot_app()
@@ -49,8 +65,12 @@ async def run():
             await application.updater.stop()
         except Exception:
             pass
+        await delivery.close()
         await application.stop()
         await application.shutdown()
+        await close_clients()
+        await close_render_pool()
+        shutdown_parse_pool()
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,10 @@
+# tests/conftest.py
+import os
+import tempfile
+
+# app.config and app.db read these at import time: a throwaway SQLite file, no network
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test")
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["PARSE_WORKERS"] = "0"
+os.environ["HTTP_CACHE_ENABLED"] = "false"
+os.environ["ENRICH_ENABLED"] = "false"
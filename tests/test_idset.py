@@ -0,0 +1,20 @@
+# tests/test_idset.py
+from app.utils.idset import encode_ids, decode_ids
+
+
+def test_round_trip_sorts_and_dedupes():
+    assert decode_ids(encode_ids([5, 1, 5, 300, 2])) == [1, 2, 5, 300]
+
+
+def test_multi_byte_deltas():
+    ids = [0, 127, 128, 16_383, 16_384, 2**31, 2**40 + 7]
+    assert decode_ids(encode_ids(ids)) == ids
+
+
+def test_small_deltas_take_one_byte_each():
+    assert len(encode_ids(range(1, 101))) == 100
+
+
+def test_empty():
+    assert encode_ids([]) == b""
+    assert decode_ids(b"") == []
@@ -0,0 +1,65 @@
+# tests/test_ingest.py
+import asyncio
+from datetime import datetime, timezone
+from sqlalchemy import select
+from app.db import init_db, engine, read_engine, SessionLocal
+from app.models import Listing
+from app.schemas import RawListing
+from app.services.ingest import UpsertResult, upsert_listings
+
+BASE = (43.2965, 5.3698)
+
+
+def run(coro):
+    async def go():
+        try:
+            await init_db()
+            return await coro
+        finally:
+            await engine.dispose()
+            await read_engine.dispose()
+    return asyncio.run(go())
+
+
+def lot(ext: str, price: float = 10.0, **kw) -> RawListing:
+    return RawListing(source="test", external_id=ext, url=f"https://x/{ext}", title=f"Lot {ext}", price_value=price, **kw)
+
+
+async def stored(ext: str) -> Listing:
+    async with SessionLocal() as s:
+        return (await s.execute(select(Listing).where(Listing.source == "test", Listing.external_id == ext))).scalar_one()
+
+
+def test_counts_inserted_updated_unchanged():
+    assert run(upsert_listings([lot("a1"), lot("a2")], *BASE)) == UpsertResult(inserted=2)
+    assert run(upsert_listings([lot("a1"), lot("a2", 12.0), lot("a3")], *BASE)) == UpsertResult(1, 1, 1)
+    assert run(upsert_listings([lot("a1"), lot("a2", 12.0), lot("a3")], *BASE)) == UpsertResult(unchanged=3)
+
+
+def test_duplicate_keys_in_one_batch_count_once():
+    assert run(upsert_listings([lot("b1"), lot("b1", 11.0)], *BASE)) == UpsertResult(inserted=1)
+    assert run(stored("b1")).price_eur == 11.0
+
+
+def test_lot_without_detail_keeps_stored_detail():
+    closes = datetime(2030, 1, 1, 12, tzinfo=timezone.utc)
+    run(upsert_listings([lot("c1", location_name="Gent", weight_kg=5.0, closes_at=closes)], *BASE))
+    assert run(upsert_listings([lot("c1")], *BASE)) == UpsertResult(unchanged=1)
+    assert run(upsert_listings([lot("c1", 15.0)], *BASE)) == UpsertResult(updated=1)
+    row = run(stored("c1"))
+    assert (row.price_eur, row.location_name, row.weight_kg) == (15.0, "Gent", 5.0)
+
+
+def test_category_change_is_not_a_content_change():
+    run(upsert_listings([lot("d1", category="shoes")], *BASE))
+    assert run(upsert_listings([lot("d1", category="sneakers")], *BASE)) == UpsertResult(unchanged=1)
+    assert run(stored("d1")).category == "shoes"
+
+
+def test_concurrent_upserts_insert_each_lot_once():
+    async def both():
+        batch = [lot(f"e{i}") for i in range(50)]
+        return await asyncio.gather(upsert_listings(batch, *BASE), upsert_listings(list(batch), *BASE))
+    first, second = run(both())
+    assert first.inserted + second.inserted == 50
+    assert first.total == second.total == 50
@@ -0,0 +1,26 @@
+# tests/test_matcher.py
+from app.services.matcher import AhoCorasick, WatchMatcher
+
+
+def test_any_keyword_of_a_watch_matches():
+    m = WatchMatcher([(1, "nike adidas"), (2, "bosch")])
+    assert m.match("Adidas Superstar lot") == {1}
+    assert m.match("Bosch drill, Nike box") == {1, 2}
+    assert m.match("Makita drill") == set()
+
+
+def test_folding_accents_case_and_punctuation():
+    m = WatchMatcher([(1, "Élégant"), (2, "air-max")])
+    assert m.match("CHAUSSURES ELEGANTES") == {1}
+    assert m.match("Nike Air Max 90") == {2}
+
+
+def test_category_gate():
+    m = WatchMatcher([(1, "nike")], gate=["shoe", "sneaker"])
+    assert m.match("Nike shirt") == set()
+    assert m.match("Nike sneakers") == {1}
+
+
+def test_overlapping_patterns():
+    ac = AhoCorasick(["he", "she", "his", "hers"])
+    assert {ac.patterns[i] for i in ac.find("ushers")} == {"he", "she", "hers"}
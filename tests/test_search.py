@@ -0,0 +1,41 @@
+# tests/test_search.py
+import sqlite3
+import pytest
+from app.services.search import Term, parse_query, to_fts5, to_tsquery
+
+
+def test_parse_words_phrases_and_prefix():
+    assert parse_query('Nike "Air  Max" adi*') == [
+        Term(["nike"]), Term(["air", "max"]), Term(["adi"], prefix=True),
+    ]
+
+
+def test_parse_drops_empty_and_punctuation_only_tokens():
+    assert parse_query('"" -- * nike') == [Term(["nike"])]
+
+
+def test_hyphenated_word_is_a_phrase():
+    assert parse_query("nike-air*") == [Term(["nike", "air"], prefix=True)]
+
+
+def test_to_fts5_quotes_every_term():
+    terms = parse_query('nike OR "air max" adi* col:x NEAR(y)')
+    assert to_fts5(terms) == '"nike" AND "or" AND "air max" AND "adi"* AND "col x" AND "near y"'
+
+
+def test_to_tsquery():
+    assert to_tsquery(parse_query('nike "air max" adi*')) == "nike & (air <-> max) & adi:*"
+
+
+@pytest.mark.parametrize("q", ['nike OR', '"unterminated', 'a AND NOT b', "col:x^2", "x) OR (y", "NEAR(a b)", "*", '"*"'])
+def test_fts5_accepts_any_user_query(q):
+    terms = parse_query(q)
+    if not terms:
+        return
+    db = sqlite3.connect(":memory:")
+    try:
+        db.execute("CREATE VIRTUAL TABLE t USING fts5(title)")
+    except sqlite3.OperationalError:
+        pytest.skip("SQLite built without FTS5")
+    db.execute("INSERT INTO t VALUES ('nike air max or near x y')")
+    db.execute("SELECT rowid FROM t WHERE t MATCH ?", (to_fts5(terms),)).fetchall()